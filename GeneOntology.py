@@ -7,11 +7,13 @@ import re
 motif = re.compile("GO:(\d)*")  # Re for GO Term
 
 
-def load_OBO(filename):
+def load_OBO(filename, in_edges=False):
     """
     parse the OBO file and returns the graph
     obsolete terms are discarded
     only is_a and part_of relationships are loaded
+    in_edges: if True, the incoming edges are indexed (see Graph.index_in_edges()): descendants
+        and annotated gene products are then read from go['in_edges'] instead of scanning all the edges
 
     :param return nested dictionnaries with:
         'alt_id': { 'alternative_GOTerm_id' : 'GOTerm_id'}
@@ -20,6 +22,7 @@ def load_OBO(filename):
         'nb_edges': number of edges
         'nodes': { 'GO Term' : { properties}}
         'descendants': { 'Parent_GO' : ['Children GO']}
+        'in_edges': { 'Parent_GO' : { 'Child_GO' : {type : 'is_a' or 'part of'}}}, only if in_edges is True
         'weight_attribute': None
         'weighted': False
 
@@ -69,7 +72,7 @@ def load_OBO(filename):
                 e['type'] = 'part_of'
 
     # instantiate directed graph and additionnal graph attributes
-    g = gr.create_graph(directed=True, weighted=False)
+    g = gr.create_graph(directed=True, weighted=False, in_edges=in_edges)
     g['alt_id'] = {}  # alternate GO ids
     with open(filename) as f:
         line = f.readline().rstrip()
@@ -99,6 +102,10 @@ def add_all_descendants(go):
 	Create a dictionnary from a go Graph with ancestor as key and list of descendants as value
 	GoTerm with no descendant have empty list as value
 	'''
+    if 'in_edges' in go:  # children read from the incoming edges index
+        go["descendants"] = {GO: [child for child in children if motif.search(child)]
+                             for GO, children in go['in_edges'].items() if motif.search(GO)}
+        return
     descendants = {}
     for GO in go['edges'].keys():
         if motif.search(GO):  # If a GOTerm
@@ -261,11 +268,18 @@ def GeneProducts(go, term, all=True, evidence_code=None):
             descendants_queue.update(direct_descendants)
             descendants.update(direct_descendants)
 
+        if 'in_edges' in go:  # gene products read from the incoming edges of the descendants
+            annotated = set()
+            for descendant in descendants:
+                annotated.update(p for p in go['in_edges'][descendant] if not motif.search(p))
+            return [p for p in go['edges'] if p in annotated]  # same order as the scan below
         # Get all gene product linked to at least one descendant of Term
         for id_geneproduct in go['edges'].keys():
             if not (motif.search(id_geneproduct)):  # If not a GOTerm
                 if collection_disjoint(go['edges'][id_geneproduct], descendants):
                     gene_products.append(id_geneproduct)
+    elif 'in_edges' in go:
+        gene_products = [p for p in go['in_edges'][term] if not motif.search(p)]
     else:
         for id_geneproduct in go['edges'].keys():
             if not (motif.search(id_geneproduct)):  # If not a GOTerm
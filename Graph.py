@@ -1,20 +1,45 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import operator
+from array import array  # compact typed columns for frozen (CSR) graphs
+from collections import OrderedDict, deque
+from collections.abc import Mapping, MutableMapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import gzip
+import heapq
+import itertools
+import json  # binary snapshots headers
+import mmap  # memory mapped Floyd-Warshall matrices and binary snapshots
+from multiprocessing import shared_memory  # graph snapshots shared by worker processes
+import os
+import random  # betweenness() pivots sampling
+import sys
+import time
+import tracemalloc  # peak memory of profiled calls (see profile())
 
+try:  # optional: vectorised Floyd-Warshall
+    import numpy
+except ImportError:
+    numpy = None
 
-# for Floyd-Warshall matrices
+# buffer size used when reading files
+_BUFFER_SIZE = 1 << 20
 
 
 # Graph manipulation functions
 ##############################
 
-def create_graph(directed=True, weighted=False):  # TP1
+def create_graph(directed=True, weighted=False, columnar=False, in_edges=False):  # TP1
     """
     create a dictionnary representing a graph and returns it.
+    columnar: if True, edges attributes are stored by column in g['edge_columns'] (see EdgeColumns)
+    in_edges: if True, incoming edges of directed graphs are indexed in g['in_edges'] (see index_in_edges())
     """
     g = {'nodes': {}, 'edges': {}, 'nb_edges': 0, 'directed': directed, 'weighted': weighted, 'weight_attribute': None}
+    if columnar:
+        g['edge_columns'] = EdgeColumns()
+    if in_edges and directed:
+        g['in_edges'] = {}
     return g
 
 
@@ -28,7 +53,13 @@ def add_node(g, n, attributes=None):  # TP1
         if attributes is None:  # create empty attributes if not provided
             attributes = {}
         g['nodes'][n] = attributes
-        g['edges'][n] = {}  # init outgoing edges
+        g['edges'][n] = _new_neighbours(g)  # init outgoing edges
+        if 'in_edges' in g:  # see index_in_edges()
+            g['in_edges'][n] = _new_neighbours(g)
+        if 'components' in g:  # see track_components()
+            ds_add(g['components'], n)
+        if 'version' in g:  # see cached_BFS()
+            _bump_version(g)
     return g['nodes'][n]  # return node attributes
 
 
@@ -41,64 +72,347 @@ def add_edge(g, n1, n2, attributes=None, n1_attributes=None, n2_attributes=None)
         if attributes is None:  # create empty attributes if not provided
             attributes = {}
         g['edges'][n1][n2] = attributes
+        if 'edge_columns' in g:  # attributes are stored in a row of the columns, read through a view
+            attributes = g['edges'][n1][n2]
         if not g['directed']:
             g['edges'][n2][n1] = g['edges'][n1][n2]  # share the same attributes as n1->n2
         g['nb_edges'] += 1
+        if 'components' in g:
+            ds_union(g['components'], n1, n2)
+        if 'typed_edges' in g:  # see index_edge_types()
+            _index_edge_type(g, n1, n2, attributes)
+        if 'in_edges' in g:
+            g['in_edges'][n2][n1] = attributes
+        if 'version' in g:
+            _bump_version(g)
     return g['edges'][n1][n2]  # return edge attributes
 
 
-def load_SIF(filename, directed=True):  # TP1
+# optional indexes maintained by add_node() and add_edge()
+_INDEXES = ('components', 'typed_edges', 'in_edges')
+
+
+def _new_neighbours(g):
+    """
+    empty { neighbour : edge attributes } mapping of a node of g, holding row numbers for columnar graphs
+    """
+    columns = g.get('edge_columns')
+    return {} if columns is None else _ColumnarNeighbours(columns)
+
+
+def create_interner():
+    """
+    create an interning table giving dense integer ids (0, 1, ...) to node ids:
+    'index': { node id : integer id }, 'ids': node ids indexed by their integer id
+    """
+    return {'index': {}, 'ids': []}
+
+
+def intern_node(interner, n):
+    """
+    integer id of node id n in interner, given on its first occurrence
+    """
+    i = interner['index'].get(n)
+    if i is None:
+        i = interner['index'][n] = len(interner['ids'])
+        interner['ids'].append(n)
+    return i
+
+
+def add_edges(g, edges, attributes=None, interner=None):
+    """
+	add a batch of edges to the graph g, creating missing nodes (without attributes).
+	edges: iterable of (n1, n2) or (n1, n2, attributes dict) tuples, e.g. zip(sources, targets); the attributes dicts are copied
+	attributes: { attribute name : sequence of values } columns aligned with edges, added to the edges attributes
+	interner: if provided, nodes are added with their integer id given by intern_node()
+	returns the number of added edges (already existing edges are kept unchanged).
+	"""
+    names = list(attributes) if attributes else []
+    rows = zip(*attributes.values()) if attributes else None
+    if any(index in g for index in _INDEXES):  # indexes are updated by add_edge()
+        count = g['nb_edges']
+        for e in edges:
+            att = dict(e[2]) if len(e) > 2 else {}
+            if rows is not None:
+                att.update(zip(names, next(rows)))
+            u, v = e[0], e[1]
+            if interner is not None:
+                u, v = intern_node(interner, u), intern_node(interner, v)
+            add_edge(g, u, v, att)
+        return g['nb_edges'] - count
+
+    nodes, adjacency, directed = g['nodes'], g['edges'], g['directed']
+    columns = g.get('edge_columns')
+    nb_nodes = len(nodes)
+    count = 0
+    for e in edges:
+        att = dict(e[2]) if len(e) > 2 else {}
+        if rows is not None:
+            att.update(zip(names, next(rows)))
+        u, v = e[0], e[1]
+        if interner is not None:
+            u, v = intern_node(interner, u), intern_node(interner, v)
+        if u not in nodes:
+            nodes[u] = {}
+            adjacency[u] = _new_neighbours(g)
+        if v not in nodes:
+            nodes[v] = {}
+            adjacency[v] = _new_neighbours(g)
+        neighbours = adjacency[u]
+        if v not in neighbours:
+            if columns is not None:  # both ways of an undirected edge share its row
+                att = EdgeView(columns, columns.add(att))
+            neighbours[v] = att
+            if not directed:
+                adjacency[v][u] = att  # share the same attributes as u->v
+            count += 1
+    g['nb_edges'] += count
+    if 'version' in g:
+        _bump_version(g, count + len(nodes) - nb_nodes)
+    return count
+
+
+def remove_edge(g, n1, n2):
+    """
+	remove the edge n1 -> n2 (both ways for undirected graphs) from the graph g.
+	returns the removed edge attributes.
+	"""
+    attributes = g['edges'][n1].pop(n2)
+    if not g['directed']:
+        g['edges'][n2].pop(n1, None)
+    if 'in_edges' in g:
+        del g['in_edges'][n2][n1]
+    if 'typed_edges' in g:
+        adjacency = g['typed_edges']['types'].get(attributes.get(g['typed_edges']['attribute']), {})
+        adjacency.get(n1, {}).pop(n2, None)
+        if not g['directed']:
+            adjacency.get(n2, {}).pop(n1, None)
+    g['nb_edges'] -= 1
+    if 'components' in g:  # components may be split: recompute them
+        track_components(g)
+    if 'version' in g:
+        _bump_version(g)
+    return attributes
+
+
+def index_in_edges(g):
+    """
+	build the index of the incoming edges of directed graph g: g['in_edges'] = { node : { predecessor : edge attributes }},
+	then maintained by add_node(), add_edge() and remove_edge(). Undirected graphs do not need it.
+	"""
+    if g['directed']:
+        g['in_edges'] = {n: _new_neighbours(g) for n in g['nodes']}
+        for u, neighbours in g['edges'].items():
+            for v, att in neighbours.items():
+                g['in_edges'][v][u] = att
+    return g.get('in_edges', g['edges'])
+
+
+def predecessors(g, n):
+    """
+	list of the nodes with an edge to n: read from g['in_edges'] if indexed (see index_in_edges()),
+	otherwise all the edges are scanned.
+	"""
+    if not g['directed']:
+        return list(g['edges'][n])
+    if 'in_edges' in g:
+        return list(g['in_edges'][n])
+    return [u for u, neighbours in g['edges'].items() if n in neighbours]
+
+
+def in_degree(g, n):
+    """
+	number of edges to n (see predecessors())
+	"""
+    if not g['directed']:
+        return len(g['edges'][n])
+    if 'in_edges' in g:
+        return len(g['in_edges'][n])
+    return sum(1 for neighbours in g['edges'].values() if n in neighbours)
+
+
+def index_edge_types(g, attribute='type'):
+    """
+	build per type adjacencies of graph g in g['typed_edges'], maintained by add_edge() and remove_edge():
+	{'attribute': attribute, 'types': { type : { node : { successor : edge attributes }}}}
+	so that searches restricted to some edge types (edge_type parameter) only read those edges.
+	The type of an edge is read when it is added: set it in the attributes given to add_edge().
+	"""
+    g['typed_edges'] = {'attribute': attribute, 'types': {}}
+    for u, neighbours in g['edges'].items():
+        for v, att in neighbours.items():
+            _index_edge_type(g, u, v, att, both_ways=False)  # undirected edges are already read both ways
+    return g['typed_edges']
+
+
+def _index_edge_type(g, n1, n2, attributes, both_ways=True):
+    index = g['typed_edges']
+    adjacency = index['types'].setdefault(attributes.get(index['attribute']), {})
+    if n1 not in adjacency:
+        adjacency[n1] = _new_neighbours(g)
+    adjacency[n1][n2] = attributes
+    if both_ways and not g['directed']:
+        if n2 not in adjacency:
+            adjacency[n2] = _new_neighbours(g)
+        adjacency[n2][n1] = attributes
+
+
+def edges_of_type(G, edge_type):
+    """
+	adjacency { node : { successor : edge attributes }} of the edges of G selected by edge_type (nodes without
+	such edges may be missing):
+	    None: all the edges
+	    a type or a set of types: edges whose type attribute (see index_edge_types(), default 'type') is among them
+	    a function f(u, v, attributes): edges for which it returns True
+	Without index, or with a function, the successors of a node are only filtered when the search asks for them.
+	"""
+    if edge_type is None:
+        return G['edges']
+    edges = G['edges']
+    index = G.get('typed_edges')
+    if callable(edge_type):
+        return _EdgesOfType(edges, lambda u: {v: att for v, att in edges[u].items() if edge_type(u, v, att)})
+    types = list(edge_type) if isinstance(edge_type, (set, frozenset, list, tuple)) else [edge_type]
+    if index is None:  # no index: filter the edges of each node
+        return _EdgesOfType(edges, lambda u: {v: att for v, att in edges[u].items() if att.get('type') in types})
+    if len(types) == 1:
+        return index['types'].get(types[0], {})
+    adjacencies = [index['types'][t] for t in types if t in index['types']]
+
+    def successors(u):
+        if u not in edges:
+            raise KeyError(u)
+        merged = {}
+        for adjacency in adjacencies:
+            merged.update(adjacency.get(u, ()))
+        return merged
+
+    return _EdgesOfType(edges, successors)
+
+
+class _EdgesOfType(Mapping):
+    """
+    adjacency returned by edges_of_type(), computing the successors of a node on access
+    """
+    __slots__ = ('_nodes', '_successors')
+
+    def __init__(self, nodes, successors):
+        self._nodes = nodes
+        self._successors = successors
+
+    def __getitem__(self, u):
+        return self._successors(u)
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+
+def _open(filename):
+    """
+    open a text file for reading with a large buffer, transparently decompressing .gz files
+    """
+    if filename.endswith('.gz'):
+        return gzip.open(filename, 'rt')
+    return open(filename, buffering=_BUFFER_SIZE)
+
+
+def _lines(f):
+    """
+    iterate on the lines of file f, reading it by chunks of about _BUFFER_SIZE bytes
+    """
+    chunk = f.readlines(_BUFFER_SIZE)
+    while chunk:
+        yield from chunk
+        chunk = f.readlines(_BUFFER_SIZE)
+
+
+def iter_SIF_edges(filename):
+    """
+    parse a SIF (cytoscape Simple Interaction Format) file (possibly gzipped) and yields its edges
+    as (source, destination, attributes) without building a graph.
+    line syntax: nodeD <relationship type> nodeE nodeF nodeB
+    """
+    with _open(filename) as f:
+        for row in _lines(f):
+            vals = row.rstrip().split('\t')
+            for v in vals[2:]:
+                yield vals[0], v, {'type': vals[1]}  # set edge type
+
+
+def load_SIF(filename, directed=True, components=False, columnar=False, type_index=False):  # TP1
     """
-	parse a SIF (cytoscape Simple Interaction Format) file and returns a directed graph.
+	parse a SIF (cytoscape Simple Interaction Format) file (possibly gzipped) and returns a directed graph.
 	line syntax: nodeD <relationship type> nodeE nodeF nodeB
+	components: if True, connected components are maintained while loading (see track_components())
+	columnar: if True, edges attributes are stored by column (see EdgeColumns)
+	type_index: if True, edges are also indexed by relationship type (see index_edge_types())
 	"""
-    g = create_graph(directed)  # new empty graph
-    with open(filename) as f:  # OPEN FILE
-        # PROCESS THE REMAINING LINES
-        row = f.readline().rstrip()  # read next line and remove ending whitespaces
-        while row:
-            vals = row.split('\t')  # split line on tab
-            for i in range(2, len(vals)):
-                att = {'type': vals[1]}  # set edge type
-                add_edge(g, vals[0], vals[i], att)
-            row = f.readline().rstrip()  # read next line
+    g = create_graph(directed, columnar=columnar)  # new empty graph
+    if components:
+        track_components(g)
+    if type_index:
+        index_edge_types(g)
+    add_edges(g, iter_SIF_edges(filename))
     return g  # return created graph
 
 
-def load_TAB(filename, directed=True, weighted=False, spacer='\t', tweight_attribute=None):  # TP3
+def iter_TAB_edges(filename, spacer='\t', types=None):
     """
-	parse a TAB file (as cytoscape format) and returns a graph.
+	parse a TAB file (as cytoscape format, possibly gzipped) and yields its edges as
+	(id1, id2, attributes) without building a graph.
 
 	line syntax: id1	id2	att1	att2	att3	...
+	types: { column name : conversion function (e.g. float) }, columns not listed are kept as strings
 	"""
-    g = create_graph(directed, weighted)
-    with open(filename) as f:
-        # GET COLUMNS NAMES
-        tmp = f.readline().rstrip()
-        attNames = tmp.split(spacer)
-        # REMOVES FIRST TWO COLUMNS WHICH CORRESPONDS TO THE LABELS OF THE CONNECTED VERTICES
-        attNames.pop(0)
-        attNames.pop(0)
+    with _open(filename) as f:
+        lines = _lines(f)
+        # GET COLUMNS NAMES, EXCEPT THE LABELS OF THE CONNECTED VERTICES
+        attNames = next(lines, '').rstrip('\r\n').split(spacer)[2:]
+        convert = [(name, types[name]) for name in attNames if types and name in types]
         # PROCESS THE REMAINING LINES
-        row = f.readline().rstrip()
-        while row:
-            vals = row.split(spacer)
-            u = vals.pop(0)
-            v = vals.pop(0)
-            att = {}
-            for i in range(len(attNames)):
-                att[attNames[i]] = vals[i]
-            add_edge(g, u, v, att)
-            row = f.readline().rstrip()  # NEXT LINE
-        return g
+        for row in lines:
+            vals = row.rstrip('\r\n').split(spacer)
+            if len(vals) < 2:  # blank line
+                continue
+            att = dict(zip(attNames, vals[2:]))
+            for name, to_type in convert:
+                if name in att:
+                    att[name] = to_type(att[name])
+            yield vals[0], vals[1], att
+
+
+def load_TAB(filename, directed=True, weighted=False, spacer='\t', tweight_attribute=None, types=None,
+             components=False, columnar=False, type_attribute=None):  # TP3
+    """
+	parse a TAB file (as cytoscape format, possibly gzipped) and returns a graph.
+
+	line syntax: id1	id2	att1	att2	att3	...
+	tweight_attribute: column used as edges weight (stored in g['weight_attribute'])
+	types: { column name : conversion function (e.g. float) }, columns not listed are kept as strings
+	components: if True, connected components are maintained while loading (see track_components())
+	columnar: if True, edges attributes are stored by column (see EdgeColumns)
+	type_attribute: if provided, edges are also indexed by the values of this column (see index_edge_types())
+	"""
+    g = create_graph(directed, weighted, columnar)
+    g['weight_attribute'] = tweight_attribute
+    if components:
+        track_components(g)
+    if type_attribute is not None:
+        index_edge_types(g, type_attribute)
+    add_edges(g, iter_TAB_edges(filename, spacer, types))
+    return g
 
 
-def BFS(G, s):
+def BFS(G, s, edge_type=None):
     """
     Breadth-first search (BFS): explores all the direct neighbors layer by layer from a source node.
 
     :param G: Graph
     :param s: source node
+    :param edge_type: only follow the edges selected by edge_type (see edges_of_type())
     :return: Dictionary with
         color:
             'black': reachable from the source node
@@ -118,26 +432,210 @@ def BFS(G, s):
     graph_path['distance'][s] = 0
     graph_path['predecessor'][s] = None
 
+    stats = _start_call('BFS') if _profilers or _profile_callbacks else None  # see profile()
+    edges = edges_of_type(G, edge_type)
     # Queue initialization
-    Q = []
+    Q = deque()
     Q.append(s)
     while len(Q) > 0:
-        u = Q.pop(0)
-        for v in list(G['edges'][u].keys()):  # iterates on direct neighbours of u
+        u = Q.popleft()
+        neighbours = edges.get(u, ())
+        for v in neighbours:  # iterates on direct neighbours of u
             if graph_path['color'][v] == "white":  # if unvisited
                 graph_path['color'][v] = "grey"
                 graph_path['distance'][v] = graph_path['distance'][u] + 1
                 graph_path['predecessor'][v] = u
                 Q.append(v)  # Add each neighbors to the queue
         graph_path['color'][u] = "black"  # set at black once all direct neighbours visited
+        if stats is not None:
+            stats.nodes_expanded += 1
+            stats.pushes += 1  # each node expanded was pushed once
+            stats.edges_scanned += len(neighbours)
+            if len(Q) > stats.peak_frontier:
+                stats.peak_frontier = len(Q)
+    if stats is not None:
+        _finish_call(stats)
     return graph_path
 
 
-def DFS(G):
+def reverse_edges(g):
+    """
+    build the reverse adjacency of graph g: { node : { predecessor : edge attributes }}.
+    For undirected graphs, g['edges'] is returned as is. For directed graphs with an incoming edges index,
+    g['in_edges'] is returned (see index_in_edges()).
+    """
+    if not g['directed']:
+        return g['edges']
+    if 'in_edges' in g:
+        return g['in_edges']
+    reverse = {n: {} for n in g['nodes']}
+    for u, neighbours in g['edges'].items():
+        for v, att in neighbours.items():
+            reverse[v][u] = att
+    return reverse
+
+
+def shortest_path(G, s, t, reverse=None):
+    """
+    Point-to-point shortest path (number of edges) using a bidirectional breadth-first search.
+    Both searches only store the nodes they visit and stop as soon as their frontiers meet.
+    Directed graphs need their reverse adjacency for the search from t: reverse, or G['in_edges'] if indexed
+    (see index_in_edges()). Without it, a breadth-first search from s stops as soon as it reaches t.
+
+    :param G: Graph
+    :param s: source node
+    :param t: target node
+    :param reverse: reverse adjacency of G (see reverse_edges())
+    :return: list of nodes from s to t, None if t is unreachable from s
+    """
+    if s == t:
+        return [s]
+    forward = G['edges']
+    if reverse is None:
+        if G['directed'] and 'in_edges' not in G:
+            return _forward_path(forward, s, t)
+        reverse = reverse_edges(G)
+    # predecessor (from s side) and successor (from t side) of visited nodes
+    pred = {s: None}
+    succ = {t: None}
+    front_s = deque([s])
+    front_t = deque([t])
+    meet = None
+    while front_s and front_t and meet is None:
+        # expand the smallest frontier by one full layer
+        if len(front_s) <= len(front_t):
+            front, adjacency, seen, other = front_s, forward, pred, succ
+        else:
+            front, adjacency, seen, other = front_t, reverse, succ, pred
+        for i in range(len(front)):
+            u = front.popleft()
+            for v in adjacency[u]:
+                if v not in seen:
+                    seen[v] = u
+                    front.append(v)
+                    if v in other:
+                        meet = v
+                        break
+            if meet is not None:
+                break
+
+    if meet is None:
+        return None
+    path = []
+    n = meet
+    while n is not None:  # back to s
+        path.append(n)
+        n = pred[n]
+    path.reverse()
+    n = succ[meet]
+    while n is not None:  # forward to t
+        path.append(n)
+        n = succ[n]
+    return path
+
+
+def _forward_path(edges, s, t):
+    """
+    shortest path from s to t with a breadth-first search from s stopping at t
+    """
+    pred = {s: None}
+    Q = deque([s])
+    while Q:
+        u = Q.popleft()
+        for v in edges[u]:
+            if v not in pred:
+                pred[v] = u
+                if v == t:
+                    path = []
+                    while v is not None:
+                        path.append(v)
+                        v = pred[v]
+                    path.reverse()
+                    return path
+                Q.append(v)
+    return None
+
+
+def DFS_events(G, sources=None, edge_type=None):
+    """
+    Iterative depth-first search yielding its events as they happen, without recursion limit.
+
+    :param G: Graph
+    :param sources: nodes to start the search from, in order (default: all the nodes of G)
+    :param edge_type: only follow the edges selected by edge_type (see edges_of_type())
+    :return: generator of (event, u, v) tuples with event among:
+        'discover': u seen for the first time, v is its predecessor (None for a root)
+        'finish': all the neighbours of u visited (v is None)
+        'tree edge', 'back edge', 'forward edge', 'cross edge': type of the edge u -> v (see DFS())
+    """
+    stats = _start_call('DFS') if _profilers or _profile_callbacks else None  # see profile()
+    edges = edges_of_type(G, edge_type)
+    discovery = {}  # discovery time of seen nodes
+    try:
+        yield from _DFS_events(G, sources, edges, discovery, stats)
+    finally:  # also when the consumer stops early
+        if stats is not None:
+            _finish_call(stats)
+
+
+def _DFS_events(G, sources, edges, discovery, stats):
+    """
+    events of DFS_events(), filling discovery
+    """
+    grey = set()  # nodes seen but not finished
+    time = 0
+    for r in (G['nodes'] if sources is None else sources):
+        if r in discovery:
+            continue
+        time += 1
+        discovery[r] = time
+        grey.add(r)
+        yield ('discover', r, None)
+        stack = [(r, iter(edges.get(r, ())))]
+        if stats is not None:
+            stats.nodes_expanded += 1
+            stats.pushes += 1
+            if not stats.peak_frontier:
+                stats.peak_frontier = 1
+        while stack:
+            u, neighbours = stack[-1]
+            for v in neighbours:  # resumes where u was left
+                if stats is not None:
+                    stats.edges_scanned += 1
+                if v not in discovery:
+                    yield ('tree edge', u, v)
+                    time += 1
+                    discovery[v] = time
+                    grey.add(v)
+                    yield ('discover', v, u)
+                    stack.append((v, iter(edges.get(v, ()))))
+                    if stats is not None:
+                        stats.nodes_expanded += 1
+                        stats.pushes += 1
+                        if len(stack) > stats.peak_frontier:
+                            stats.peak_frontier = len(stack)
+                    break
+                elif v in grey:
+                    yield ('back edge', u, v)
+                elif discovery[v] < discovery[u]:
+                    yield ('cross edge', u, v)
+                else:
+                    yield ('forward edge', u, v)
+            else:  # all neighbours visited: backtrack
+                stack.pop()
+                grey.discard(u)
+                time += 1
+                yield ('finish', u, None)
+
+
+def DFS(G, outputs=None, edge_type=None):
     '''
     Depth-first search (DFS): from a arbitrary source node explores as far as possible along each branch before backtracking.
 
     :param G: Graph
+    :param outputs: keys of the returned dictionary to fill (default: all of them),
+        e.g. ['last_seen'] to only get the backtracking times
+    :param edge_type: only follow the edges selected by edge_type (see edges_of_type())
     :return: Dictionnary with :
         color: excepted to be black for all nodes.
                 during execution go from white to grey to black for unseen, first seen, last seen
@@ -152,47 +650,50 @@ def DFS(G):
         last_seen: time when seen during backtracking
 
     '''
-
-    graph_path = {'color': {}, 'predecessor': {}, 'discovery': {}, 'time': 0, 'edge_type': {}, 'last_seen': {}}
-
-    def DFS_visit(u):
-        graph_path['color'][u] = "grey"  # Set at grey for first visit
-        graph_path["time"] += 1  # Time tracking of search
-        graph_path['discovery'][u] = graph_path["time"]  # Time of discovery
-        for v in list(G['edges'][u].keys()):  # Iterates on neighbours nodes
-            if graph_path['color'][v] == "white":
-                graph_path['predecessor'][v] = u
-                DFS_visit(v)
-                graph_path['edge_type'][(u, v)] = "tree edge"
-            elif graph_path['color'][v] == "grey":
-                graph_path['edge_type'][(u, v)] = "back edge"
-            elif graph_path['discovery'][v] < graph_path['discovery'][u]:
-                graph_path['edge_type'][(u, v)] = "cross edge"
-            else:
-                graph_path['edge_type'][(u, v)] = "forward edge"
-        graph_path['color'][u] = "black"  # Set at back: last visit
-        graph_path["time"] += 1
-        graph_path['last_seen'][u] = graph_path["time"]  # Time of backtracking
+    if outputs is None:
+        outputs = ('color', 'predecessor', 'discovery', 'time', 'edge_type', 'last_seen')
+    graph_path = {key: {} for key in outputs}
+    predecessor = graph_path.get('predecessor')
+    discovery = graph_path.get('discovery')
+    edge_types = graph_path.get('edge_type')
+    last_seen = graph_path.get('last_seen')
 
     # Initialization of all nodes
-    for u in list(G['nodes'].keys()):
-        graph_path['color'][u] = "white"
-        graph_path['predecessor'][u] = None
-        graph_path["time"] = 0
+    if 'color' in graph_path:
+        for u in G['nodes']:
+            graph_path['color'][u] = "black"  # every node is reached from one of the roots
+    if predecessor is not None:
+        for u in G['nodes']:
+            predecessor[u] = None
 
     # Depth Search
-    for u in list(G['nodes']):
-        if graph_path['color'][u] == "white":  # If univisited
-            DFS_visit(u)
+    time = 0
+    for event, u, v in DFS_events(G, edge_type=edge_type):
+        if event == 'discover':
+            time += 1
+            if discovery is not None:
+                discovery[u] = time
+            if predecessor is not None:
+                predecessor[u] = v
+        elif event == 'finish':
+            time += 1
+            if last_seen is not None:
+                last_seen[u] = time
+        elif edge_types is not None:
+            edge_types[(u, v)] = event
+    if 'time' in graph_path:
+        graph_path['time'] = time
     return graph_path
 
 
 def is_acyclic(g):
-    res = DFS(g)
-    for values in res['edge_type'].values():
-        if values == "back edge":  # Circuit in graph
+    """
+    return True if graph g has no circuit (stops at the first back edge found)
+    """
+    for event, u, v in DFS_events(g):
+        if event == "back edge":  # Circuit in graph
             return False
-        return True
+    return True
 
 
 def topological_sort(g):
@@ -202,29 +703,106 @@ def topological_sort(g):
     :param g: graph
     :return: list of nodes from first task to do to the last one
     """
-    test = is_acyclic((g))
-    if test:
-        depth_search = DFS(g)
-        back_tracking = depth_search['last_seen']
-        # Convert key-value to set and order by value
-        sorted_backtracking = sorted(back_tracking.items(), key=operator.itemgetter(1))
-        sorted_backtracking.reverse()
-        topo_sort = [el[0] for el in sorted_backtracking]  # Get nodes name
-        return topo_sort
-    else:
+    res = Kahn(g)
+    if res['cycle'] is not None:  # Circuit in graph
         return "Topological sort can not be performed on cyclic graph"
+    return res['order']
+
+
+def Kahn(g, layers=False):
+    """
+    Kahn topological sort: repeatedly removes the nodes without remaining incoming edges, in O(V+E).
+
+    :param g: graph
+    :param layers: if True, also groups nodes in layers: nodes of a layer only depend on nodes of previous layers
+    :return: Dictionary with:
+        'order': topologically sorted nodes (only the sortable ones if there is a circuit)
+        'layers': list of lists of nodes (None if layers is False)
+        'cycle': list of nodes of a circuit in edges order, None if the graph is acyclic
+    """
+    in_degree = {n: 0 for n in g['nodes']}
+    for neighbours in g['edges'].values():
+        for v in neighbours:
+            in_degree[v] += 1
+    layer = [n for n, d in in_degree.items() if d == 0]
+    order = []
+    all_layers = [] if layers else None
+    while layer:
+        order.extend(layer)
+        if layers:
+            all_layers.append(layer)
+        next_layer = []
+        for u in layer:
+            for v in g['edges'][u]:
+                in_degree[v] -= 1
+                if in_degree[v] == 0:  # all its dependencies are done
+                    next_layer.append(v)
+        layer = next_layer
+
+    cycle = None
+    if len(order) < len(in_degree):
+        cycle = _remaining_cycle(g, [n for n, d in in_degree.items() if d > 0])
+    return {'order': order, 'layers': all_layers, 'cycle': cycle}
+
+
+def _remaining_cycle(g, remaining):
+    """
+    find a circuit among the nodes left by Kahn() (in nodes order): each of them has a predecessor among them
+    """
+    predecessor = {}
+    left = set(remaining)
+    for u in remaining:
+        for v in g['edges'][u]:
+            if v in left:
+                predecessor[v] = u
+    u = remaining[0]
+    seen = set()
+    while u not in seen:  # walk back until a node is seen twice
+        seen.add(u)
+        u = predecessor[u]
+    cycle = [u]
+    v = predecessor[u]
+    while v != u:
+        cycle.append(v)
+        v = predecessor[v]
+    cycle.reverse()  # in edges order
+    return cycle
+
+
+def run_layers(g, task, workers=None):
+    """
+    run task(node) for every node of a directed acyclic graph g on a pool of threads,
+    a node being run only once all its predecessors are done (see Kahn() layers).
+
+    :param g: graph
+    :param task: function called with a node
+    :param workers: number of threads (default: ThreadPoolExecutor default)
+    :return: { node : value returned by task(node) }
+    """
+    res = Kahn(g, layers=True)
+    if res['cycle'] is not None:
+        raise Exception("tasks can not be scheduled on cyclic graph: %s" % res['cycle'])
+    results = {}
+    with ThreadPoolExecutor(workers) as executor:
+        for layer in res['layers']:
+            results.update(zip(layer, executor.map(task, layer)))
+    return results
 
 
-def Bellman_Ford(G, s, w):
+def Bellman_Ford(G, s, w, queue=False, edge_type=None):
     '''
     Bellman Ford computes shortest path from a source node to all the other nodes from the graph
     :param G: Graph
     :param s: source node
     :param w: weight parameter to compute on
+    :param queue: if True, only relaxes the edges of the nodes whose distance changed (FIFO work queue)
+        and looks for negative cycles
+    :param edge_type: only use the edges selected by edge_type (see edges_of_type())
     :return: A Dictionnary with:
         'distance': distance from source node
         'predecessor': direct predecessor of a node in the shortest path
                     (Note: None for source node)
+        'negative_cycle': (queue mode only) list of nodes of a negative cycle reachable from s, None if there is none
 	'''
     shortest_path = {'distance': {}, 'predecessor': {}}
 
@@ -235,21 +813,2463 @@ def Bellman_Ford(G, s, w):
             shortest_path["predecessor"][v] = None
         shortest_path['distance'][s] = 0  # source node distance initialized at 0
 
-    def relax(u, v, w):
-        # if new path between source node and v are shorter than the previous computed
-        if shortest_path["distance"][v] > shortest_path["distance"][u] + int(G["edges"][u][v][w]):
-            # Distance between source node and v is updated
-            shortest_path['distance'][v] = shortest_path["distance"][u] + int(G["edges"][u][v][w])
-            # Predecessor of v in the new shortest path is updated
-            shortest_path['predecessor'][v] = u
-
+    stats = _start_call('Bellman_Ford') if _profilers or _profile_callbacks else None  # see profile()
     initialize_single_source(G, s)
+    # Weights converted once: { u : [(v, weight)] }
+    weights = {u: [(v, _weight(att[w])) for v, att in neighbours.items()]
+               for u, neighbours in edges_of_type(G, edge_type).items()}
+
+    if queue:
+        shortest_path['negative_cycle'] = _Bellman_Ford_queue(weights, [s], shortest_path, stats)
+        if stats is not None:
+            _finish_call(stats)
+        return shortest_path
 
+    distance = shortest_path['distance']
+    predecessor = shortest_path['predecessor']
+    relaxations = 0
+    if stats is not None:
+        nb_weights = sum(len(edges) for edges in weights.values())
     # Computes shortest path
-    for i in range(1, len(G['nodes']) - 1):
-        for source in G["edges"].keys():
-            for destination in G["edges"][source]:
-                relax(source, destination, w)
+    for i in range(len(G['nodes']) - 1):
+        updated = False
+        for source, edges in weights.items():
+            for destination, weight in edges:
+                # if new path between source node and destination are shorter than the previous computed
+                if distance[destination] > distance[source] + weight:
+                    distance[destination] = distance[source] + weight
+                    predecessor[destination] = source
+                    updated = True
+                    relaxations += 1
+        if stats is not None:
+            stats.iterations += 1
+            stats.nodes_expanded += len(weights)
+            stats.edges_scanned += nb_weights
+        if not updated:  # no more changes in next passes
+            break
+    if stats is not None:
+        _finish_call(stats, relaxations=relaxations)
+    return shortest_path
+
+
+def _Bellman_Ford_queue(weights, sources, shortest_path, stats=None):
+    """
+    queue based Bellman Ford (SPFA) filling shortest_path (initialized with the distances of the sources).
+    returns a negative cycle reachable from the sources as a list of nodes, None if there is none.
+    stats: CallStats to count the search events in (see profile())
+    """
+    distance = shortest_path['distance']
+    predecessor = shortest_path['predecessor']
+    n = len(distance)
+    length = {s: 0 for s in sources}  # number of edges of the current path from a source
+    Q = deque(sources)
+    queued = set(sources)
+    if stats is not None:
+        stats.pushes += len(Q)
+    while Q:
+        u = Q.popleft()
+        queued.discard(u)
+        du = distance[u]
+        if stats is not None:
+            stats.nodes_expanded += 1
+            stats.edges_scanned += len(weights.get(u, ()))
+        for v, weight in weights.get(u, ()):
+            if distance[v] > du + weight:
+                distance[v] = du + weight
+                predecessor[v] = u
+                if stats is not None:
+                    stats.relaxations += 1
+                length[v] = length[u] + 1
+                if length[v] >= n:  # a shortest path can not have n edges: negative cycle
+                    cycle = _predecessor_cycle(predecessor, v)
+                    if cycle is not None:
+                        return cycle
+                if v not in queued:
+                    queued.add(v)
+                    Q.append(v)
+                    if stats is not None:
+                        stats.pushes += 1
+                        stats.peak_frontier = max(stats.peak_frontier, len(Q))
+    return None
+
+
+def _predecessor_cycle(predecessor, v):
+    """
+    return the cycle found by following the predecessors from v, None if they lead back to the source
+    """
+    seen = set()
+    while v is not None and v not in seen:
+        seen.add(v)
+        v = predecessor[v]
+    if v is None:
+        return None
+    cycle = [v]
+    u = predecessor[v]
+    while u != v:
+        cycle.append(u)
+        u = predecessor[u]
+    cycle.reverse()  # in edges order
+    return cycle
+
+
+def _weight(value):
+    """
+    convert an edge weight (possibly loaded as a string) to a number
+    """
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+    return value
+
+
+def has_negative_weights(G, w):
+    """
+    return True if at least one edge of G has a negative weight attribute w
+    """
+    for neighbours in G['edges'].values():
+        for att in neighbours.values():
+            if _weight(att[w]) < 0:
+                return True
+    return False
+
+
+def Dijkstra(G, s, w, target=None, edge_type=None):
+    '''
+    Dijkstra computes shortest path from a source node to all the other nodes from the graph,
+    using a binary heap. Weights must be non-negative.
+    :param G: Graph
+    :param s: source node
+    :param w: weight parameter to compute on
+    :param target: if provided, stops as soon as the shortest path to target is known
+    :param edge_type: only use the edges selected by edge_type (see edges_of_type())
+    :return: same dictionary as Bellman_Ford()
+    '''
+    shortest_path = {'distance': {}, 'predecessor': {}}
+    distance = shortest_path['distance']
+    predecessor = shortest_path['predecessor']
+    for v in G['nodes']:
+        distance[v] = float("inf")
+        predecessor[v] = None
+    distance[s] = 0
+
+    edges = edges_of_type(G, edge_type)
+    heap = [(0, 0, s)]  # (distance, insertion counter, node): the counter avoids comparing node ids
+    counter = 1
+    done = set()
+    while heap:
+        d, c, u = heapq.heappop(heap)
+        if u in done:  # outdated heap entry
+            continue
+        done.add(u)
+        if u == target:
+            break
+        for v, att in edges.get(u, {}).items():
+            weight = _weight(att[w])
+            if weight < 0:
+                raise Exception("Dijkstra can not be performed with negative weight on edge (%s, %s)" % (u, v))
+            if d + weight < distance[v]:
+                distance[v] = d + weight
+                predecessor[v] = u
+                heapq.heappush(heap, (d + weight, counter, v))
+                counter += 1
     return shortest_path
 
 
+def A_star(G, s, t, w, heuristic):
+    '''
+    A* search of the shortest path from s to t. Weights must be non-negative.
+    :param G: Graph
+    :param s: source node
+    :param t: target node
+    :param w: weight parameter to compute on
+    :param heuristic: function returning, for a node, a lower bound of its distance to t
+    :return: A Dictionnary with:
+        'distance': distance from s to t (inf if unreachable)
+        'path': list of nodes from s to t (None if unreachable)
+    '''
+    distance = {s: 0}
+    predecessor = {s: None}
+    heap = [(heuristic(s), 0, 0, s)]  # (estimated total, insertion counter, distance from s, node)
+    counter = 1
+    while heap:
+        f, c, d, u = heapq.heappop(heap)
+        if d > distance[u]:  # outdated heap entry
+            continue
+        if u == t:
+            path = []
+            while u is not None:
+                path.append(u)
+                u = predecessor[u]
+            path.reverse()
+            return {'distance': distance[t], 'path': path}
+        for v, att in G['edges'][u].items():
+            weight = _weight(att[w])
+            if weight < 0:
+                raise Exception("A* can not be performed with negative weight on edge (%s, %s)" % (u, v))
+            if v not in distance or d + weight < distance[v]:
+                distance[v] = d + weight
+                predecessor[v] = u
+                heapq.heappush(heap, (d + weight + heuristic(v), counter, d + weight, v))
+                counter += 1
+    return {'distance': float("inf"), 'path': None}
+
+
+def shortest_paths(G, s, w, non_negative=None):
+    '''
+    single source shortest paths: Dijkstra when the weights are non-negative, Bellman Ford otherwise.
+    :param G: Graph
+    :param s: source node
+    :param w: weight parameter to compute on
+    :param non_negative: True/False if the sign of the weights is known, checked on the edges if None
+    :return: same dictionary as Bellman_Ford()
+    '''
+    if non_negative is None:
+        non_negative = not has_negative_weights(G, w)
+    if non_negative:
+        return Dijkstra(G, s, w)
+    return Bellman_Ford(G, s, w)
+
+
+def _matrix(n, typecode, value, filename=None):
+    """
+    n x n matrix stored row by row in a flat array filled with value,
+    or in a memory mapped file if filename is provided.
+    returns the matrix and its mmap object (None if in memory)
+    """
+    if filename is None:
+        return array(typecode, [value]) * (n * n), None
+    row = array(typecode, [value]) * n
+    with open(filename, 'w+b') as f:
+        for i in range(n):
+            row.tofile(f)
+        f.flush()
+        size = f.tell()
+        if size == 0:  # empty graph: nothing to map
+            return array(typecode), None
+        mm = mmap.mmap(f.fileno(), size)  # still valid once the file is closed
+    return memoryview(mm).cast(typecode), mm
+
+
+def Floyd_Warshall(G, w, filename=None):
+    '''
+    Floyd Warshall computes the shortest paths between all pairs of nodes.
+    With NumPy, each step k updates blocks of rows at once from column k and row k (numpy.memmap files if
+    filename is provided). Without it, the matrices are arrays updated cell by cell in Python: n^3 interpreted
+    operations, around ten seconds for 500 nodes.
+    :param G: Graph
+    :param w: weight parameter to compute on
+    :param filename: if provided, distance and predecessor matrices are stored in memory mapped files
+        filename.distance and filename.predecessor instead of memory
+    :return: A Dictionnary with:
+        'ids': node ids indexed by their matrix row/column
+        'index': { node id : row/column }
+        'distance': n x n distances matrix (flat, row by row)
+        'predecessor': n x n matrix of the predecessor of column j in the shortest path from row i (-1 if none)
+        'negative_cycle': True if the graph contains a negative cycle
+        'mmaps': mmap objects (numpy.memmap with NumPy) of the matrices (see close_all_pairs())
+    Use all_pairs_distance() and all_pairs_path() to query it by node ids.
+    '''
+    ids = list(G['nodes'])
+    index = {u: i for i, u in enumerate(ids)}
+    n = len(ids)
+    inf = float("inf")
+    if numpy is not None and n > 0:
+        return _Floyd_Warshall_numpy(G, w, ids, index, filename)
+    D, mmD = _matrix(n, 'd', inf, None if filename is None else filename + '.distance')
+    P, mmP = _matrix(n, 'q', -1, None if filename is None else filename + '.predecessor')
+
+    # Initialization with edges weights
+    for i in range(n):
+        D[i * n + i] = 0
+    for u, neighbours in G['edges'].items():
+        i = index[u]
+        for v, att in neighbours.items():
+            ij = i * n + index[v]
+            weight = _weight(att[w])
+            if weight < D[ij]:
+                D[ij] = weight
+                P[ij] = i
+
+    # Computes shortest paths through intermediate node k
+    for k in range(n):
+        row_k = D[k * n:(k + 1) * n].tolist()
+        pred_k = P[k * n:(k + 1) * n].tolist()
+        for i in range(n):
+            d_ik = D[i * n + k]
+            if d_ik == inf or i == k:
+                continue
+            start = i * n
+            row_i = D[start:start + n].tolist()
+            for j in [j for j, (d_ij, d_kj) in enumerate(zip(row_i, row_k)) if d_ik + d_kj < d_ij]:
+                D[start + j] = d_ik + row_k[j]
+                P[start + j] = pred_k[j]
+
+    negative_cycle = any(D[i * n + i] < 0 for i in range(n))
+    return {'ids': ids, 'index': index, 'distance': D, 'predecessor': P, 'negative_cycle': negative_cycle,
+            'mmaps': [mm for mm in (mmD, mmP) if mm is not None]}
+
+
+def _Floyd_Warshall_numpy(G, w, ids, index, filename):
+    """
+    Floyd_Warshall() with NumPy matrices, updated by blocks of rows
+    """
+    n = len(ids)
+    if filename is None:
+        D = numpy.full((n, n), numpy.inf)
+        P = numpy.full((n, n), -1, dtype=numpy.int64)
+    else:
+        D = numpy.memmap(filename + '.distance', dtype=numpy.float64, mode='w+', shape=(n, n))
+        P = numpy.memmap(filename + '.predecessor', dtype=numpy.int64, mode='w+', shape=(n, n))
+        D[:] = numpy.inf
+        P[:] = -1
+    numpy.fill_diagonal(D, 0)
+    for u, neighbours in G['edges'].items():
+        i = index[u]
+        for v, att in neighbours.items():
+            j = index[v]
+            weight = _weight(att[w])
+            if weight < D[i, j]:
+                D[i, j] = weight
+                P[i, j] = i
+
+    block = max(1, (1 << 22) // n)  # rows per update: bounded temporary matrices
+    for k in range(n):
+        row_k = D[k].copy()
+        pred_k = P[k].copy()
+        for start in range(0, n, block):
+            rows = D[start:start + block]
+            candidate = rows[:, k, None] + row_k  # through k
+            better = candidate < rows
+            numpy.copyto(rows, candidate, where=better)
+            numpy.copyto(P[start:start + block], pred_k, where=better)
+
+    negative_cycle = bool((numpy.diagonal(D) < 0).any())
+    return {'ids': ids, 'index': index, 'distance': D.reshape(-1), 'predecessor': P.reshape(-1),
+            'negative_cycle': negative_cycle, 'mmaps': [] if filename is None else [D, P]}
+
+
+def all_pairs_distance(M, u, v):
+    """
+    distance from u to v in the result of Floyd_Warshall()
+    """
+    n = len(M['ids'])
+    return float(M['distance'][M['index'][u] * n + M['index'][v]])
+
+
+def all_pairs_path(M, u, v):
+    """
+    shortest path from u to v (list of nodes) in the result of Floyd_Warshall(), None if v is unreachable
+    """
+    n = len(M['ids'])
+    i, j = M['index'][u], M['index'][v]
+    if i != j and M['predecessor'][i * n + j] < 0:
+        return None
+    path = [j]
+    while j != i:
+        j = int(M['predecessor'][i * n + j])
+        path.append(j)
+    path.reverse()
+    return [M['ids'][x] for x in path]
+
+
+def close_all_pairs(M):
+    """
+    release the memory mapped files of the result of Floyd_Warshall()
+    """
+    for key in ('distance', 'predecessor'):
+        if isinstance(M[key], memoryview):
+            M[key].release()
+    for mm in M['mmaps']:
+        if isinstance(mm, mmap.mmap):
+            mm.close()
+        else:  # numpy.memmap, unmapped once no longer referenced
+            mm.flush()
+            M['distance'] = M['predecessor'] = None
+    M['mmaps'] = []
+
+
+def Johnson(G, w, workers=None):
+    '''
+    Johnson computes the shortest paths between all pairs of nodes of a sparse graph, negative weights allowed:
+    weights are made non-negative with one Bellman Ford pass, then a Dijkstra is run from every source
+    by a pool of worker processes sharing a read-only frozen copy of the graph (see share()).
+    :param G: Graph
+    :param w: weight parameter to compute on
+    :param workers: number of worker processes (default: number of CPUs, 1 runs in the current process)
+    :return: generator of (source, shortest paths) pairs, in G['nodes'] order,
+        shortest paths being the same dictionary as Bellman_Ford().
+        At most 2 * workers searches are computed ahead of the consumer, and the pending ones are
+        cancelled if the generator is closed early.
+    '''
+    # Reweighting: distances from a virtual node linked to every node with a 0 weight
+    weights = {u: [(v, _weight(att[w])) for v, att in neighbours.items()] for u, neighbours in G['edges'].items()}
+    reweighting = {'distance': {v: 0 for v in G['nodes']}, 'predecessor': {v: None for v in G['nodes']}}
+    if _Bellman_Ford_queue(weights, list(G['nodes']), reweighting) is not None:
+        raise Exception("Johnson can not be performed on graph with negative cycle")
+    F = freeze(G, w)
+    ids = F['ids']
+    h = [reweighting['distance'][u] for u in ids]
+    for u in range(len(ids)):
+        for j in range(F['offsets'][u], F['offsets'][u + 1]):
+            F['weights'][j] += h[u] - h[F['targets'][j]]
+
+    def original_weights(s, distance, predecessor):
+        inf = float("inf")
+        return {'distance': {v: (d - h[s] + h[i] if d != inf else inf) for i, (v, d) in enumerate(zip(ids, distance))},
+                'predecessor': {v: (ids[p] if p >= 0 else None) for v, p in zip(ids, predecessor)}}
+
+    if workers is None:
+        workers = os.cpu_count()
+    if workers <= 1:
+        for s in range(len(ids)):
+            yield ids[s], original_weights(s, *_frozen_Dijkstra(F, s))
+        return
+    shm, snapshot = share(F)
+    executor = ProcessPoolExecutor(workers, initializer=_attach_worker, initargs=(snapshot,))
+    try:
+        results = _ordered_results(executor, _worker_Dijkstra, [(s,) for s in range(len(ids))], 2 * workers)
+        for s, (distance, predecessor) in enumerate(results):
+            yield ids[s], original_weights(s, distance, predecessor)
+    finally:
+        executor.shutdown(cancel_futures=True)
+        shm.close()
+        shm.unlink()
+
+
+class DynamicShortestPaths:
+    """
+    single source shortest paths kept up to date while edges are inserted, removed or get a lower weight.
+
+    Edges must be changed through the methods of this object, which also update the graph:
+    insertions and weight decreases only propagate from the improved node, removals only
+    recompute the part of the shortest paths tree below the removed edge.
+    """
+
+    def __init__(self, G, s, w=None):
+        """
+        :param G: Graph
+        :param s: source node
+        :param w: weight parameter to compute on, None to count edges
+        """
+        self.G = G
+        self.s = s
+        self.w = w
+        self.reverse = reverse_edges(G)
+        # reverse adjacency to update here (not g['edges'] nor g['in_edges'], updated by the graph functions)
+        self._own_reverse = G['directed'] and 'in_edges' not in G
+        res = BFS(G, s) if w is None else shortest_paths(G, s, w)
+        self.distance = res['distance']
+        self.predecessor = res['predecessor']
+
+    def result(self):
+        """
+        same dictionary as Bellman_Ford()
+        """
+        return {'distance': self.distance, 'predecessor': self.predecessor}
+
+    def _weight(self, u, v):
+        return 1 if self.w is None else _weight(self.G['edges'][u][v][self.w])
+
+    def _propagate(self, Q):
+        """
+        label correcting propagation of the improved distances of the nodes in queue Q
+        """
+        queued = set(Q)
+        updates = {}
+        while Q:
+            u = Q.popleft()
+            queued.discard(u)
+            du = self.distance[u]
+            for v in self.G['edges'][u]:
+                d = du + self._weight(u, v)
+                if d < self.distance[v]:
+                    self.distance[v] = d
+                    self.predecessor[v] = u
+                    updates[v] = updates.get(v, 0) + 1
+                    if updates[v] > len(self.distance):
+                        raise Exception("negative cycle reachable from %s" % self.s)
+                    if v not in queued:
+                        queued.add(v)
+                        Q.append(v)
+
+    def _relax(self, u, v):
+        """
+        propagate the improvement brought by edge u -> v, if any
+        """
+        d = self.distance[u] + self._weight(u, v)
+        if d < self.distance[v]:
+            self.distance[v] = d
+            self.predecessor[v] = u
+            self._propagate(deque([v]))
+
+    def insert_edge(self, u, v, attributes=None):
+        """
+        add edge u -> v to the graph (see add_edge()) and update the shortest paths
+        """
+        for n in (u, v):
+            if n not in self.G['nodes']:
+                self.distance[n] = float("inf")
+                self.predecessor[n] = None
+                if self._own_reverse:
+                    self.reverse[n] = {}
+        e = add_edge(self.G, u, v, attributes)
+        if self._own_reverse:
+            self.reverse[v][u] = e
+        self._relax(u, v)
+        if not self.G['directed']:
+            self._relax(v, u)
+        return e
+
+    def decrease_weight(self, u, v, value):
+        """
+        set the weight of edge u -> v to value and update the shortest paths: a lower weight propagates
+        from v, a higher one recomputes the shortest paths subtree below the edge if it was part of it
+        """
+        if self.w is None:
+            raise Exception("shortest paths computed without weight attribute")
+        increase = _weight(value) > self._weight(u, v)
+        self.G['edges'][u][v][self.w] = value
+        if 'version' in self.G:  # see cached_BFS()
+            _bump_version(self.G)
+        if increase:
+            if self.predecessor[v] == u:
+                self._recompute(v)
+            if not self.G['directed'] and self.predecessor[u] == v:
+                self._recompute(u)
+            return
+        self._relax(u, v)
+        if not self.G['directed']:
+            self._relax(v, u)
+
+    def delete_edge(self, u, v):
+        """
+        remove edge u -> v from the graph (see remove_edge()) and update the shortest paths
+        """
+        remove_edge(self.G, u, v)
+        if self._own_reverse:
+            del self.reverse[v][u]
+        if self.predecessor[v] == u:
+            self._recompute(v)
+        if not self.G['directed'] and self.predecessor[u] == v:
+            self._recompute(u)
+
+    def _recompute(self, root):
+        """
+        recompute the distances of the shortest paths subtree of root, from its unaffected predecessors
+        """
+        affected = {root}
+        stack = [root]
+        while stack:  # subtree of root in the shortest paths tree
+            x = stack.pop()
+            for y in self.G['edges'][x]:
+                if self.predecessor[y] == x and y not in affected:
+                    affected.add(y)
+                    stack.append(y)
+        for x in affected:
+            self.distance[x] = float("inf")
+            self.predecessor[x] = None
+        Q = deque()
+        for x in affected:  # best distance through nodes outside the subtree
+            for y in self.reverse[x]:
+                if y not in affected and self.distance[y] + self._weight(y, x) < self.distance[x]:
+                    self.distance[x] = self.distance[y] + self._weight(y, x)
+                    self.predecessor[x] = y
+            if self.distance[x] < float("inf"):
+                Q.append(x)
+        self._propagate(Q)
+
+
+# Cached searches
+#################
+
+# least recently used results first: { (graph token, algorithm, source, weight) : (version, result, size) }
+# and the keys of each graph: { graph token : set of keys }. Graphs are identified by the integer token
+# stored in G['cache_token'], so that the cache does not keep deleted graphs alive.
+_cache = {'entries': OrderedDict(), 'graphs': {}, 'bytes': 0, 'max_entries': 128, 'max_bytes': 256 << 20,
+          'hits': 0, 'misses': 0}
+_cache_tokens = itertools.count()
+
+
+def set_cache_limits(max_entries=128, max_bytes=256 << 20):
+    """
+    bound the number of results kept by cached_BFS() and cached_shortest_paths() and their estimated size
+    """
+    _cache['max_entries'] = max_entries
+    _cache['max_bytes'] = max_bytes
+    _evict()
+
+
+def clear_cache():
+    """
+    drop all the results kept by cached_BFS() and cached_shortest_paths()
+    """
+    _cache['entries'].clear()
+    _cache['graphs'].clear()
+    _cache['bytes'] = 0
+
+
+def cache_info():
+    """
+    Dictionary with the number of cached results ('entries') and of graphs they belong to ('graphs'),
+    their estimated size ('bytes'), the limits and the number of 'hits' and 'misses'
+    """
+    return {key: (len(value) if key in ('entries', 'graphs') else value) for key, value in _cache.items()}
+
+
+def _result_size(result):
+    """
+    estimated memory size of a search result (dictionary of dictionaries)
+    """
+    return sys.getsizeof(result) + sum(sys.getsizeof(value) for value in result.values())
+
+
+def _drop(key):
+    version, result, size = _cache['entries'].pop(key)
+    _cache['bytes'] -= size
+    keys = _cache['graphs'][key[0]]
+    keys.discard(key)
+    if not keys:
+        del _cache['graphs'][key[0]]
+
+
+def _evict():
+    entries = _cache['entries']
+    while entries and (len(entries) > _cache['max_entries'] or _cache['bytes'] > _cache['max_bytes']):
+        _drop(next(iter(entries)))  # least recently used
+
+
+def _bump_version(g, changes=1):
+    """
+    count changes of a graph used by cached searches, whose results are dropped at once
+    """
+    g['version'] += changes
+    for key in list(_cache['graphs'].get(g['cache_token'], ())):
+        _drop(key)
+
+
+def _cached(G, algorithm, s, w, search):
+    """
+    result of search() for key (G, algorithm, s, w) computed on the current version of G
+    """
+    if 'version' not in G:  # start counting changes made by add_node() and add_edge()
+        G['version'] = 0
+        G['cache_token'] = next(_cache_tokens)
+    entries = _cache['entries']
+    key = (G['cache_token'], algorithm, s, w)
+    if key in entries:
+        version, result, size = entries[key]
+        if version == G['version']:
+            entries.move_to_end(key)
+            _cache['hits'] += 1
+            return result
+        _drop(key)
+    _cache['misses'] += 1
+    result = search()
+    size = _result_size(result)
+    entries[key] = (G['version'], result, size)
+    _cache['graphs'].setdefault(key[0], set()).add(key)
+    _cache['bytes'] += size
+    _evict()
+    return result
+
+
+def cached_BFS(G, s):
+    """
+    BFS() result kept in a bounded least recently used cache, recomputed once G changes
+    through add_node() or add_edge() (a 'version' counter and a 'cache_token' are added to G).
+    The returned dictionary is shared by later calls and must not be modified.
+    """
+    return _cached(G, 'BFS', s, None, lambda: BFS(G, s))
+
+
+def cached_shortest_paths(G, s, w, algorithm='auto'):
+    """
+    shortest paths result kept in a bounded least recently used cache (see cached_BFS()).
+
+    :param algorithm: 'auto' (see shortest_paths()), 'Dijkstra' or 'Bellman_Ford'
+    """
+    search = {'auto': shortest_paths, 'Dijkstra': Dijkstra, 'Bellman_Ford': Bellman_Ford}[algorithm]
+    return _cached(G, algorithm, s, w, lambda: search(G, s, w))
+
+
+# Compact (CSR) graph functions
+###############################
+
+def freeze(g, w=None, reverse=False):
+    """
+    convert a graph g into a compact read-only graph stored as compressed sparse rows (CSR).
+
+    nodes are renumbered 0..n-1 following g['nodes'] order, and the outgoing edges of node i are
+    targets[offsets[i]:offsets[i+1]] (same order as g['edges']).
+
+    :param g: Graph
+    :param w: weight attribute to store as a float column (default: g['weight_attribute'], if any)
+    :param reverse: if True and g is directed, also build the transposed graph (see transpose()) in 'reverse'
+    :return: Dictionary with:
+        'ids': node ids indexed by their integer id
+        'index': { node id : integer id }
+        'offsets': array of n+1 positions in targets
+        'targets': array of integer ids of the edges destinations
+        'weights': array of edges weights (None if no weight attribute)
+        'weight_attribute', 'directed', 'weighted', 'nb_edges': copied from g
+        'reverse': transposed frozen graph, only with reverse=True for a directed graph
+    """
+    if w is None:
+        w = g['weight_attribute']
+    ids = list(g['nodes'])
+    index = {n: i for i, n in enumerate(ids)}
+    offsets = array('q', [0])
+    targets = array('i')
+    weights = array('d') if w is not None else None
+    for n in ids:
+        edges = g['edges'][n]
+        targets.extend([index[v] for v in edges])
+        if weights is not None:
+            weights.extend([float(att[w]) for att in edges.values()])
+        offsets.append(len(targets))
+    F = {'ids': ids, 'index': index, 'offsets': offsets, 'targets': targets, 'weights': weights,
+         'weight_attribute': w, 'directed': g['directed'], 'weighted': g['weighted'],
+         'nb_edges': g['nb_edges']}
+    if reverse and g['directed']:
+        F['reverse'] = transpose(F)
+    return F
+
+
+def frozen_BFS(F, s):
+    """
+    Breadth-first search on a frozen graph (see freeze()).
+
+    :param F: frozen graph
+    :param s: source node id
+    :return: same dictionary as BFS()
+    """
+    offsets, targets = F['offsets'], F['targets']
+    n = len(F['ids'])
+    distance = [-1] * n
+    predecessor = [-1] * n
+    src = F['index'][s]
+    distance[src] = 0
+    Q = deque([src])
+    while Q:
+        u = Q.popleft()
+        d = distance[u] + 1
+        for v in targets[offsets[u]:offsets[u + 1]]:
+            if distance[v] < 0:  # if unvisited
+                distance[v] = d
+                predecessor[v] = u
+                Q.append(v)
+
+    # Back to node ids
+    ids = F['ids']
+    graph_path = {'color': {}, 'distance': {}, 'predecessor': {}}
+    for i, n in enumerate(ids):
+        reached = distance[i] >= 0
+        graph_path['color'][n] = "black" if reached else "white"
+        graph_path['distance'][n] = distance[i] if reached else float("inf")
+        graph_path['predecessor'][n] = ids[predecessor[i]] if predecessor[i] >= 0 else None
+    return graph_path
+
+
+def frozen_DFS(F):
+    """
+    Depth-first search on a frozen graph (see freeze()).
+    Uses an explicit stack so it is not bound by the recursion limit.
+
+    :param F: frozen graph
+    :return: same dictionary as DFS()
+    """
+    offsets, targets, ids = F['offsets'], F['targets'], F['ids']
+    n = len(ids)
+    color = [0] * n  # 0: white, 1: grey, 2: black
+    discovery = [0] * n
+    last_seen = [0] * n
+    predecessor = [-1] * n
+    edge_type = {}
+    time = 0
+    for r in range(n):
+        if color[r]:
+            continue
+        time += 1
+        color[r] = 1
+        discovery[r] = time
+        stack = [[r, offsets[r]]]  # node and position of its next edge to explore
+        while stack:
+            top = stack[-1]
+            u, i = top
+            if i < offsets[u + 1]:
+                top[1] = i + 1
+                v = targets[i]
+                if color[v] == 0:
+                    edge_type[(ids[u], ids[v])] = "tree edge"
+                    predecessor[v] = u
+                    time += 1
+                    color[v] = 1
+                    discovery[v] = time
+                    stack.append([v, offsets[v]])
+                elif color[v] == 1:
+                    edge_type[(ids[u], ids[v])] = "back edge"
+                elif discovery[v] < discovery[u]:
+                    edge_type[(ids[u], ids[v])] = "cross edge"
+                else:
+                    edge_type[(ids[u], ids[v])] = "forward edge"
+            else:  # all neighbours visited: backtrack
+                stack.pop()
+                color[u] = 2
+                time += 1
+                last_seen[u] = time
+
+    graph_path = {'color': {}, 'predecessor': {}, 'discovery': {}, 'time': time, 'edge_type': edge_type,
+                  'last_seen': {}}
+    for i, u in enumerate(ids):
+        graph_path['color'][u] = "black"
+        graph_path['predecessor'][u] = ids[predecessor[i]] if predecessor[i] >= 0 else None
+        graph_path['discovery'][u] = discovery[i]
+        graph_path['last_seen'][u] = last_seen[i]
+    return graph_path
+
+
+def frozen_topological_sort(F):
+    """
+    Topological sort on a frozen graph (see freeze()), in a single depth-first search.
+
+    :param F: frozen graph
+    :return: list of nodes from first task to do to the last one
+    """
+    offsets, targets, ids = F['offsets'], F['targets'], F['ids']
+    n = len(ids)
+    color = [0] * n  # 0: white, 1: grey, 2: black
+    finished = []
+    for r in range(n):
+        if color[r]:
+            continue
+        color[r] = 1
+        stack = [[r, offsets[r]]]
+        while stack:
+            top = stack[-1]
+            u, i = top
+            if i < offsets[u + 1]:
+                top[1] = i + 1
+                v = targets[i]
+                if color[v] == 0:
+                    color[v] = 1
+                    stack.append([v, offsets[v]])
+                elif color[v] == 1:  # back edge: circuit in graph
+                    return "Topological sort can not be performed on cyclic graph"
+            else:
+                stack.pop()
+                color[u] = 2
+                finished.append(u)
+    finished.reverse()
+    return [ids[u] for u in finished]
+
+
+def frozen_Bellman_Ford(F, s):
+    """
+    Bellman Ford on a frozen graph (see freeze()) using its weights column.
+    Stops as soon as a pass does not update any distance.
+
+    :param F: frozen graph, frozen with a weight attribute
+    :param s: source node id
+    :return: same dictionary as Bellman_Ford()
+    """
+    offsets, targets, weights, ids = F['offsets'], F['targets'], F['weights'], F['ids']
+    if weights is None:
+        raise Exception("frozen graph has no weights, use freeze(g, w)")
+    n = len(ids)
+    inf = float("inf")
+    distance = [inf] * n
+    predecessor = [-1] * n
+    distance[F['index'][s]] = 0
+
+    for i in range(1, n):
+        updated = False
+        for u in range(n):
+            du = distance[u]
+            if du == inf:
+                continue
+            for j in range(offsets[u], offsets[u + 1]):
+                v = targets[j]
+                if distance[v] > du + weights[j]:
+                    distance[v] = du + weights[j]
+                    predecessor[v] = u
+                    updated = True
+        if not updated:
+            break
+
+    shortest_path = {'distance': {}, 'predecessor': {}}
+    for i, n in enumerate(ids):
+        shortest_path['distance'][n] = distance[i]
+        shortest_path['predecessor'][n] = ids[predecessor[i]] if predecessor[i] >= 0 else None
+    return shortest_path
+
+
+def _frozen_Dijkstra(F, src):
+    """
+    Dijkstra on a frozen graph from integer node src, returns the distance and predecessor lists
+    """
+    offsets, targets, weights = F['offsets'], F['targets'], F['weights']
+    inf = float("inf")
+    distance = [inf] * (len(offsets) - 1)
+    predecessor = [-1] * len(distance)
+    distance[src] = 0
+    heap = [(0, src)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > distance[u]:  # outdated heap entry
+            continue
+        for j in range(offsets[u], offsets[u + 1]):
+            v = targets[j]
+            if d + weights[j] < distance[v]:
+                distance[v] = d + weights[j]
+                predecessor[v] = u
+                heapq.heappush(heap, (distance[v], v))
+    return distance, predecessor
+
+
+def frozen_Dijkstra(F, s):
+    """
+    Dijkstra on a frozen graph (see freeze()) using its weights column, which must be non-negative.
+
+    :param F: frozen graph, frozen with a weight attribute
+    :param s: source node id
+    :return: same dictionary as Bellman_Ford()
+    """
+    if F['weights'] is None:
+        raise Exception("frozen graph has no weights, use freeze(g, w)")
+    distance, predecessor = _frozen_Dijkstra(F, F['index'][s])
+    ids = F['ids']
+    return {'distance': dict(zip(ids, distance)),
+            'predecessor': {v: (ids[p] if p >= 0 else None) for v, p in zip(ids, predecessor)}}
+
+
+def share(F):
+    """
+    copy the arrays of a frozen graph into a shared memory block readable by other processes.
+
+    :param F: frozen graph
+    :return: the SharedMemory object (to close and unlink once done) and a small picklable
+        snapshot description to give to attach() in the other processes
+    """
+    n, m = len(F['ids']), len(F['targets'])
+    targets_start = (n + 1) * 8
+    weights_start = targets_start + (m * 4 + 7) // 8 * 8  # 8 bytes alignment
+    size = weights_start + (m * 8 if F['weights'] is not None else 0)
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    shm.buf[:targets_start] = F['offsets'].tobytes()
+    shm.buf[targets_start:targets_start + m * 4] = F['targets'].tobytes()
+    if F['weights'] is not None:
+        shm.buf[weights_start:size] = F['weights'].tobytes()
+    snapshot = {'name': shm.name, 'ids': F['ids'], 'nb_nodes': n, 'nb_targets': m,
+                'weighted': F['weights'] is not None,
+                'directed': F['directed'], 'nb_edges': F['nb_edges'], 'weight_attribute': F['weight_attribute']}
+    return shm, snapshot
+
+
+def attach(snapshot):
+    """
+    frozen graph reading the shared memory block described by snapshot (see share()).
+    returns the frozen graph and the SharedMemory object to close once done.
+    """
+    shm = shared_memory.SharedMemory(name=snapshot['name'])
+    n, m = snapshot['nb_nodes'], snapshot['nb_targets']
+    targets_start = (n + 1) * 8
+    weights_start = targets_start + (m * 4 + 7) // 8 * 8
+    buf = shm.buf
+    F = {'ids': snapshot['ids'], 'index': None,
+         'offsets': buf[:targets_start].cast('q'),
+         'targets': buf[targets_start:targets_start + m * 4].cast('i'),
+         'weights': buf[weights_start:weights_start + m * 8].cast('d') if snapshot['weighted'] else None,
+         'weight_attribute': snapshot['weight_attribute'], 'directed': snapshot['directed'], 'weighted': snapshot['weighted'],
+         'nb_edges': snapshot['nb_edges']}
+    return F, shm
+
+
+# graph attached by each worker process of a pool
+_worker_graph = None
+
+
+def _attach_worker(snapshot):
+    global _worker_graph
+    _worker_graph = attach(snapshot)
+
+
+def _ordered_results(executor, function, arguments, in_flight):
+    """
+    results of function(*args) for each args of arguments, computed by executor and yielded in order,
+    with at most in_flight tasks submitted ahead of the consumer
+    """
+    pending = deque()
+    for args in arguments:
+        pending.append(executor.submit(function, *args))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _worker_Dijkstra(src):
+    return _frozen_Dijkstra(_worker_graph[0], src)
+
+
+def _BFS_distances(F, sources):
+    """
+    breadth-first search on a frozen graph from integer nodes sources at once.
+    returns the distances to the nearest source (-1 if unreachable) and the nearest source of each node.
+    """
+    offsets, targets = F['offsets'], F['targets']
+    distance = array('i', [-1]) * (len(offsets) - 1)
+    nearest = array('i', [-1]) * len(distance)
+    for src in sources:
+        distance[src] = 0
+        nearest[src] = src
+    Q = deque(sources)
+    while Q:
+        u = Q.popleft()
+        d = distance[u] + 1
+        for v in targets[offsets[u]:offsets[u + 1]]:
+            if distance[v] < 0:  # if unvisited
+                distance[v] = d
+                nearest[v] = nearest[u]
+                Q.append(v)
+    return distance, nearest
+
+
+def _worker_BFS(src):
+    return _BFS_distances(_worker_graph[0], [src])[0]
+
+
+def batch_BFS(G, sources, workers=None, nearest=False):
+    """
+    Breadth-first searches from many sources, spread over a pool of worker processes
+    sharing a read-only frozen copy of the graph (see share()).
+
+    :param G: Graph or frozen graph (see freeze())
+    :param sources: source nodes
+    :param workers: number of worker processes (default: number of CPUs, 1 runs in the current process)
+    :param nearest: if True, a single search from all the sources at once, in the current process
+    :return: Dictionary with:
+        'ids': node ids indexed by their position in the distance arrays
+        'distance': { source : int32 array of distances from source, -1 if unreachable }
+            or, if nearest, int32 array of distances to the nearest source
+        'nearest': (if nearest) int32 array of the position in 'ids' of the nearest source, -1 if unreachable
+    """
+    F = G if 'offsets' in G else freeze(G)
+    ids = F['ids']
+    sources = list(sources)
+    if nearest:
+        distance, nearest_source = _BFS_distances(F, [F['index'][s] for s in sources])
+        return {'ids': ids, 'distance': distance, 'nearest': nearest_source}
+
+    if workers is None:
+        workers = os.cpu_count()
+    if workers <= 1 or len(sources) <= 1:
+        return {'ids': ids, 'distance': {s: _BFS_distances(F, [F['index'][s]])[0] for s in sources}}
+    shm, snapshot = share(F)
+    executor = ProcessPoolExecutor(workers, initializer=_attach_worker, initargs=(snapshot,))
+    try:
+        distances = _ordered_results(executor, _worker_BFS, [(F['index'][s],) for s in sources], 2 * workers)
+        return {'ids': ids, 'distance': dict(zip(sources, distances))}
+    finally:
+        executor.shutdown(cancel_futures=True)
+        shm.close()
+        shm.unlink()
+
+
+def transpose(F):
+    """
+    frozen graph F with reversed edges (same node numbering), see also freeze(g, reverse=True)
+    """
+    offsets, targets, weights = F['offsets'], F['targets'], F['weights']
+    n = len(offsets) - 1
+    counts = [0] * (n + 1)
+    for v in targets:
+        counts[v + 1] += 1
+    for i in range(n):
+        counts[i + 1] += counts[i]
+    position = counts[:n]
+    reverse_targets = array('i', bytes(4 * len(targets)))
+    reverse_weights = array('d', bytes(8 * len(targets))) if weights is not None else None
+    for u in range(n):
+        for j in range(offsets[u], offsets[u + 1]):
+            v = targets[j]
+            reverse_targets[position[v]] = u
+            if weights is not None:
+                reverse_weights[position[v]] = weights[j]
+            position[v] += 1
+    R = dict(F, offsets=array('q', counts), targets=reverse_targets, weights=reverse_weights)
+    R.pop('reverse', None)
+    return R
+
+
+def direction_optimizing_BFS(F, s, alpha=14, beta=24, reverse=None):
+    """
+    Breadth-first search on a frozen graph switching, level by level, between top-down expansion of the
+    frontier and bottom-up steps where each unvisited node looks for any predecessor in the frontier
+    (stopping at the first one). Bottom-up steps save most edge checks when the frontier covers a large
+    part of the graph (small-world networks with hubs).
+
+    :param F: frozen graph, built with freeze(g, reverse=True) if directed
+    :param s: source node id
+    :param alpha: switch to bottom-up when the edges leaving the frontier exceed 1/alpha of the edges to unvisited nodes
+    :param beta: switch back to top-down when the frontier gets smaller than 1/beta of the nodes
+    :param reverse: transposed frozen graph (see transpose()) of a directed F frozen without reverse=True
+    :return: Dictionary with:
+        'ids': node ids indexed by their position in the arrays
+        'distance': int32 array of distances from s, -1 if unreachable
+        'predecessor': int32 array of the position of the predecessor, -1 for s and unreachable nodes
+        'steps': 'top-down' or 'bottom-up' for each level
+    """
+    if 'offsets' not in F:
+        raise Exception("direction_optimizing_BFS() needs a frozen graph: freeze(g, reverse=True)")
+    R = F
+    if F['directed']:
+        R = reverse if reverse is not None else F.get('reverse')
+        if R is None:
+            raise Exception("bottom-up steps need the incoming edges: freeze(g, reverse=True) or reverse=transpose(F)")
+    offsets, targets = F['offsets'], F['targets']
+    in_offsets, in_targets = R['offsets'], R['targets']
+    n = len(offsets) - 1
+    distance = array('i', [-1]) * n
+    predecessor = array('i', [-1]) * n
+    src = F['index'][s] if F['index'] is not None else F['ids'].index(s)
+    distance[src] = 0
+    unvisited_edges = len(in_targets) - (in_offsets[src + 1] - in_offsets[src])  # edges to unvisited nodes
+    frontier, unvisited, steps = [src], None, []
+    bottom_up = False
+    depth = 0
+    while frontier:
+        depth += 1
+        if bottom_up:
+            bottom_up = len(frontier) >= n / beta
+        else:
+            bottom_up = sum(offsets[u + 1] - offsets[u] for u in frontier) > unvisited_edges / alpha
+        next_frontier = []
+        if bottom_up:
+            in_frontier = bytearray(n)
+            for u in frontier:
+                in_frontier[u] = 1
+            if unvisited is None:
+                unvisited = [v for v in range(n) if distance[v] < 0]
+            remaining = []
+            for v in unvisited:
+                for u in in_targets[in_offsets[v]:in_offsets[v + 1]]:
+                    if in_frontier[u]:  # any parent in frontier
+                        distance[v] = depth
+                        predecessor[v] = u
+                        next_frontier.append(v)
+                        break
+                else:
+                    remaining.append(v)
+            unvisited = remaining
+        else:
+            for u in frontier:
+                for v in targets[offsets[u]:offsets[u + 1]]:
+                    if distance[v] < 0:  # if unvisited
+                        distance[v] = depth
+                        predecessor[v] = u
+                        next_frontier.append(v)
+            unvisited = None
+        for v in next_frontier:
+            unvisited_edges -= in_offsets[v + 1] - in_offsets[v]
+        steps.append('bottom-up' if bottom_up else 'top-down')
+        frontier = next_frontier
+    return {'ids': F['ids'], 'distance': distance, 'predecessor': predecessor, 'steps': steps}
+
+
+# Binary snapshots
+##################
+
+_SNAPSHOT_MAGIC = b'GSLSNAP\0'
+_SNAPSHOT_VERSION = 1
+
+
+def _column_kind(values):
+    """
+    storage kind of an edge attribute column: 'int' or 'float' arrays when every edge has a number,
+    'category' (codes of distinct strings) or 'json' (codes of distinct JSON encoded values) otherwise
+    """
+    kinds = {type(x) for x in values}
+    if int in kinds and any(type(x) is int and not -2 ** 63 <= x < 2 ** 63 for x in values):
+        return 'json'  # out of int64 range
+    if kinds == {int}:
+        return 'int'
+    if kinds <= {int, float} and kinds:
+        return 'float'
+    if kinds <= {str, type(None)}:
+        return 'category'
+    return 'json'
+
+
+def save_snapshot(g, path):
+    """
+    write graph g in a versioned binary file that load_snapshot() maps back in memory without parsing.
+
+    layout: magic, version and header size, JSON header (graph properties and position of each section),
+    then 8 bytes aligned sections: node ids, node attributes, CSR offsets and targets (see freeze()),
+    and one typed column per edge attribute in CSR order.
+    """
+    ids = list(g['nodes'])
+    index = {n: i for i, n in enumerate(ids)}
+    offsets = array('q', [0])
+    targets = array('i')
+    for n in ids:
+        targets.extend([index[v] for v in g['edges'][n]])
+        offsets.append(len(targets))
+    names = []
+    for neighbours in g['edges'].values():
+        for att in neighbours.values():
+            for name in att:
+                if name not in names:
+                    names.append(name)
+    missing = object()
+    sections = [('ids', json.dumps(ids).encode()),
+                ('nodes', json.dumps({i: att for i, att in enumerate(g['nodes'].values()) if att}).encode()),
+                ('offsets', offsets.tobytes()),
+                ('targets', targets.tobytes())]
+    columns = {}
+    for name in names:
+        values = [att.get(name, missing) for u in ids for att in g['edges'][u].values()]
+        present = [x for x in values if x is not missing]
+        kind = _column_kind(present)
+        if kind in ('int', 'float') and len(present) < len(values):  # arrays can not store missing values
+            kind = 'json'
+        if kind == 'int':
+            data = array('q', values)
+        elif kind == 'float':
+            data = array('d', values)
+        else:  # codes of distinct values, -1 for missing values
+            codes = {}
+            data = array('i')
+            for x in values:
+                if x is missing:
+                    data.append(-1)
+                else:
+                    key = x if kind == 'category' else json.dumps(x)
+                    data.append(codes.setdefault(key, len(codes)))
+            sections.append(('categories:' + name, json.dumps(list(codes)).encode()))
+        columns[name] = kind
+        sections.append(('column:' + name, data.tobytes()))
+
+    header = {'nb_nodes': len(ids), 'nb_edges': g['nb_edges'], 'directed': g['directed'], 'weighted': g['weighted'],
+              'weight_attribute': g['weight_attribute'], 'columns': columns, 'sections': {}}
+    position = 0
+    for name, data in sections:
+        header['sections'][name] = [position, len(data)]
+        position += (len(data) + 7) // 8 * 8
+    head = json.dumps(header).encode()
+    start = (len(_SNAPSHOT_MAGIC) + 8 + len(head) + 7) // 8 * 8
+    with open(path, 'wb') as f:
+        f.write(_SNAPSHOT_MAGIC)
+        f.write(array('I', [_SNAPSHOT_VERSION, len(head)]).tobytes())
+        f.write(head)
+        for name, data in sections:
+            f.write(b'\0' * (start + header['sections'][name][0] - f.tell()))  # alignment
+            f.write(data)
+
+
+class _Snapshot(dict):
+    """
+    frozen graph loaded by load_snapshot(): 'ids' and 'index' are only decoded on first access
+    """
+
+    def __missing__(self, key):
+        if key == 'ids':
+            value = json.loads(bytes(self['_section']('ids')))
+        elif key == 'index':
+            value = {n: i for i, n in enumerate(self['ids'])}
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
+
+
+def load_snapshot(path, use_mmap=True):
+    """
+    load a graph written by save_snapshot() as a frozen graph (see freeze()).
+    Arrays read the file directly (memory mapped if use_mmap is True, otherwise read at once),
+    and attributes are only decoded when asked for with edge_attributes() and node_attributes().
+    Only the header is parsed at load time: node ids and their index are decoded on first use.
+    thaw() rebuilds the usual dictionary graph.
+
+    :return: frozen graph with additional keys:
+        'columns': { edge attribute : (kind, array in CSR order) }
+        'buffer': memoryview on the file (see close_snapshot())
+    """
+    with open(path, 'rb') as f:
+        if use_mmap:
+            buffer = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            buffer = memoryview(f.read())
+    if bytes(buffer[:len(_SNAPSHOT_MAGIC)]) != _SNAPSHOT_MAGIC:
+        raise Exception("%s is not a graph snapshot" % path)
+    version, size = buffer[len(_SNAPSHOT_MAGIC):len(_SNAPSHOT_MAGIC) + 8].cast('I')
+    if version != _SNAPSHOT_VERSION:
+        raise Exception("unsupported graph snapshot version %s in %s" % (version, path))
+    head_start = len(_SNAPSHOT_MAGIC) + 8
+    header = json.loads(bytes(buffer[head_start:head_start + size]))
+    start = (head_start + size + 7) // 8 * 8
+
+    def section(name, typecode=None):
+        position, length = header['sections'][name]
+        data = buffer[start + position:start + position + length]
+        return data.cast(typecode) if typecode else data
+
+    columns = {}
+    for name, kind in header['columns'].items():
+        columns[name] = (kind, section('column:' + name, {'int': 'q', 'float': 'd'}.get(kind, 'i')))
+    w = header['weight_attribute']
+    weights = columns[w][1] if w in columns and columns[w][0] in ('int', 'float') else None
+    return _Snapshot({'offsets': section('offsets', 'q'), 'targets': section('targets', 'i'), 'weights': weights,
+            'weight_attribute': w, 'directed': header['directed'], 'weighted': header['weighted'],
+            'nb_edges': header['nb_edges'], 'columns': columns, 'buffer': buffer,
+            '_section': section, '_decoded': {}})
+
+
+def _snapshot_decoded(F, name):
+    """
+    decode (once) a JSON section of a loaded snapshot
+    """
+    if name not in F['_decoded']:
+        F['_decoded'][name] = json.loads(bytes(F['_section'](name)))
+    return F['_decoded'][name]
+
+
+def edge_attributes(F, u, v):
+    """
+    attributes of edge u -> v of a loaded snapshot (see load_snapshot()), as a new dictionary
+    """
+    i = F['index'][u]
+    target = F['index'][v]
+    for j in range(F['offsets'][i], F['offsets'][i + 1]):
+        if F['targets'][j] == target:
+            return _edge_attributes(F, j)
+    raise KeyError((u, v))
+
+
+def _edge_attributes(F, j):
+    att = {}
+    for name, (kind, data) in F['columns'].items():
+        if kind in ('int', 'float'):
+            att[name] = data[j]
+        elif data[j] >= 0:  # not missing
+            value = _snapshot_decoded(F, 'categories:' + name)[data[j]]
+            att[name] = value if kind == 'category' else json.loads(value)
+    return att
+
+
+def node_attributes(F, n):
+    """
+    attributes of node n of a loaded snapshot (see load_snapshot()), as a new dictionary
+    """
+    return dict(_snapshot_decoded(F, 'nodes').get(str(F['index'][n]), {}))
+
+
+def thaw(F):
+    """
+    rebuild the dictionary graph of a loaded snapshot (see load_snapshot())
+    """
+    g = create_graph(F['directed'], F['weighted'])
+    g['weight_attribute'] = F['weight_attribute']
+    for n in F['ids']:
+        add_node(g, n, node_attributes(F, n))
+    ids, offsets, targets = F['ids'], F['offsets'], F['targets']
+    for i, u in enumerate(ids):
+        for j in range(offsets[i], offsets[i + 1]):
+            if ids[targets[j]] not in g['edges'][u]:  # undirected edges are stored both ways
+                add_edge(g, u, ids[targets[j]], _edge_attributes(F, j))
+    return g
+
+
+def close_snapshot(F):
+    """
+    release the file of a loaded snapshot: F must not be used afterwards
+    """
+    obj = F['buffer'].obj
+    for key in ('offsets', 'targets'):
+        F[key].release()
+    for kind, data in F['columns'].values():
+        data.release()
+    F['buffer'].release()
+    if isinstance(obj, mmap.mmap):
+        obj.close()
+
+
+# Graph structure
+#################
+
+def _adjacency(G):
+    """
+    nodes and successors function of a graph or of a frozen graph (integer nodes, see freeze())
+    """
+    if 'offsets' in G:
+        offsets, targets = G['offsets'], G['targets']
+        return range(len(offsets) - 1), lambda u: targets[offsets[u]:offsets[u + 1]]
+    edges = G['edges']
+    return G['nodes'], edges.__getitem__
+
+
+def strongly_connected_components(G):
+    """
+    Tarjan strongly connected components, with an explicit stack (no recursion limit).
+
+    :param G: Graph or frozen graph (see freeze())
+    :return: list of components (lists of nodes), in reverse topological order:
+        no edge goes from a component to a later one
+    """
+    nodes, successors = _adjacency(G)
+    index = {}  # discovery rank
+    low = {}  # lowest rank reachable from the node subtree
+    on_stack = set()
+    stack = []
+    components = []
+    for r in nodes:
+        if r in index:
+            continue
+        index[r] = low[r] = len(index)
+        stack.append(r)
+        on_stack.add(r)
+        work = [(r, iter(successors(r)))]
+        while work:
+            u, neighbours = work[-1]
+            for v in neighbours:
+                if v not in index:
+                    index[v] = low[v] = len(index)
+                    stack.append(v)
+                    on_stack.add(v)
+                    work.append((v, iter(successors(v))))
+                    break
+                elif v in on_stack and index[v] < low[u]:
+                    low[u] = index[v]
+            else:  # u finished
+                work.pop()
+                if work and low[u] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[u]
+                if low[u] == index[u]:  # u is the root of a component
+                    component = []
+                    v = None
+                    while v != u:
+                        v = stack.pop()
+                        on_stack.discard(v)
+                        component.append(v)
+                    components.append(component)
+    if 'offsets' in G:  # back to node ids
+        components = [[G['ids'][u] for u in component] for component in components]
+    return components
+
+
+def condensation(G):
+    """
+    graph of the strongly connected components of G: each circuit is collapsed into a single node.
+
+    :param G: Graph or frozen graph (see freeze())
+    :return: directed acyclic graph whose nodes are the components numbers, in topological order, with:
+        node attributes: {'members': list of the nodes of G in the component}
+        'component': { node of G : its component number }
+    """
+    components = strongly_connected_components(G)
+    components.reverse()  # topological order
+    c = create_graph(directed=True, weighted=False)
+    component = {}
+    for i, members in enumerate(components):
+        add_node(c, i, {'members': members})
+        for n in members:
+            component[n] = i
+    nodes, successors = _adjacency(G)
+    ids = G['ids'] if 'offsets' in G else None
+    for u in nodes:
+        cu = component[u if ids is None else ids[u]]
+        for v in successors(u):
+            cv = component[v if ids is None else ids[v]]
+            if cu != cv:
+                add_edge(c, cu, cv)
+    c['component'] = component
+    return c
+
+
+def create_disjoint_set():
+    """
+    create an empty disjoint set (union-find) structure with path compression and union by rank
+    """
+    return {'parent': {}, 'rank': {}, 'nb_sets': 0}
+
+
+def ds_add(ds, x):
+    """
+    add element x in its own set if not already present
+    """
+    if x not in ds['parent']:
+        ds['parent'][x] = x
+        ds['rank'][x] = 0
+        ds['nb_sets'] += 1
+
+
+def ds_find(ds, x):
+    """
+    return the representative element of the set of x
+    """
+    parent = ds['parent']
+    root = x
+    while parent[root] != root:
+        root = parent[root]
+    while parent[x] != root:  # path compression
+        parent[x], x = root, parent[x]
+    return root
+
+
+def ds_union(ds, x, y):
+    """
+    merge the sets of x and y (added if needed), returns the representative of the merged set
+    """
+    ds_add(ds, x)
+    ds_add(ds, y)
+    x, y = ds_find(ds, x), ds_find(ds, y)
+    if x == y:
+        return x
+    rank = ds['rank']
+    if rank[x] < rank[y]:  # attach the shallower tree under the other one
+        x, y = y, x
+    ds['parent'][y] = x
+    if rank[x] == rank[y]:
+        rank[x] += 1
+    ds['nb_sets'] -= 1
+    return x
+
+
+def ds_add_edges(ds, edges):
+    """
+    merge the sets of the extremities of edges, given as (u, v, ...) tuples,
+    e.g. streamed by iter_SIF_edges() or iter_TAB_edges(). returns ds.
+    """
+    for e in edges:
+        ds_union(ds, e[0], e[1])
+    return ds
+
+
+def ds_sets(ds):
+    """
+    list of the sets of ds, as lists of elements
+    """
+    sets = {}
+    for x in ds['parent']:
+        sets.setdefault(ds_find(ds, x), []).append(x)
+    return list(sets.values())
+
+
+def track_components(g):
+    """
+    maintain the connected components of g (weakly connected for directed graphs) in g['components'],
+    a disjoint set updated by add_node() and add_edge(). returns it.
+    """
+    g['components'] = _components_disjoint_set(g)
+    return g['components']
+
+
+def _components_disjoint_set(g):
+    ds = create_disjoint_set()
+    for n in g['nodes']:
+        ds_add(ds, n)
+    for u, neighbours in g['edges'].items():
+        for v in neighbours:
+            ds_union(ds, u, v)
+    return ds
+
+
+def connected_components(G):
+    """
+    connected components of G (weakly connected for directed graphs) as lists of nodes,
+    read from g['components'] if maintained (see track_components())
+    """
+    if 'components' in G:
+        return ds_sets(G['components'])
+    return ds_sets(_components_disjoint_set(G))
+
+
+class ReachabilityIndex:
+    """
+    index answering "can u reach v?" without searching the graph.
+
+    Circuits are first collapsed (see condensation()), then each component gets either:
+        - the bitset (Python int) of all the components it reaches, built in reverse topological order,
+          when there are at most max_bitset components, constant time queries;
+        - otherwise interval labels (post order ranks of a depth-first search and lowest reachable rank),
+          which answer most queries directly and prune the search of the other ones.
+    Build time and memory used by the labels are reported in stats.
+    The index is not updated when the graph changes.
+    """
+
+    def __init__(self, G, max_bitset=20000):
+        """
+        :param G: Graph
+        :param max_bitset: maximum number of components to use bitsets
+        """
+        start = time.perf_counter()
+        C = condensation(G)
+        self.component = C['component']
+        self.members = [C['nodes'][c]['members'] for c in C['nodes']]
+        self.successors = [list(C['edges'][c]) for c in C['nodes']]
+        k = len(self.members)
+        if k <= max_bitset:
+            self.mode = 'bitset'
+            self.closure = [0] * k
+            for c in range(k - 1, -1, -1):  # edges go from a component to a later one
+                bits = 1 << c
+                for d in self.successors[c]:
+                    bits |= self.closure[d]
+                self.closure[c] = bits
+            memory = sum(sys.getsizeof(bits) for bits in self.closure)
+        else:
+            self.mode = 'interval'
+            self.pre = array('i', [0]) * k
+            self.post = array('i', [0]) * k
+            pre_rank = post_rank = 0
+            for event, u, v in DFS_events(C):
+                if event == 'discover':
+                    self.pre[u] = pre_rank
+                    pre_rank += 1
+                elif event == 'finish':
+                    self.post[u] = post_rank
+                    post_rank += 1
+            self.low = array('i', self.post)  # lowest post order rank reachable
+            for c in range(k - 1, -1, -1):
+                for d in self.successors[c]:
+                    if self.low[d] < self.low[c]:
+                        self.low[c] = self.low[d]
+            memory = sum(sys.getsizeof(a) for a in (self.pre, self.post, self.low))
+            self.predecessors = None  # see ancestors()
+        self.stats = {'mode': self.mode, 'nb_nodes': len(self.component), 'nb_components': k,
+                      'build_time': time.perf_counter() - start, 'memory': memory}
+
+    def _reaches(self, a, b):
+        """
+        can component a reach component b
+        """
+        if self.mode == 'bitset':
+            return (self.closure[a] >> b) & 1 == 1
+        post, low, pre = self.post, self.low, self.pre
+        if a == b or (pre[a] <= pre[b] and post[b] <= post[a]):  # b in the search subtree of a
+            return True
+        stack = [a]
+        seen = {a}
+        while stack:  # search pruned by intervals
+            c = stack.pop()
+            if c == b:
+                return True
+            for d in self.successors[c]:
+                if d not in seen and low[d] <= post[b] <= post[d]:
+                    seen.add(d)
+                    stack.append(d)
+        return False
+
+    def reaches(self, u, v):
+        """
+        True if there is a path from node u to node v (a node reaches itself)
+        """
+        return self._reaches(self.component[u], self.component[v])
+
+    def descendants(self, u):
+        """
+        list of the nodes reachable from node u (u included)
+        """
+        a = self.component[u]
+        if self.mode == 'bitset':
+            bits = self.closure[a]
+            return [n for c in range(a, len(self.members)) if (bits >> c) & 1 for n in self.members[c]]
+        return [n for c in self._search(a, self.successors) for n in self.members[c]]
+
+    def ancestors(self, v):
+        """
+        list of the nodes that can reach node v (v included)
+        """
+        b = self.component[v]
+        if self.mode == 'bitset':
+            return [n for c in range(b + 1) if self._reaches(c, b) for n in self.members[c]]
+        if self.predecessors is None:  # reversed condensation, built on first use
+            self.predecessors = [[] for c in self.members]
+            for c, successors in enumerate(self.successors):
+                for d in successors:
+                    self.predecessors[d].append(c)
+        return [n for c in self._search(b, self.predecessors) for n in self.members[c]]
+
+    @staticmethod
+    def _search(a, adjacency):
+        """
+        components reached from component a following adjacency, in topological order
+        """
+        seen = {a}
+        stack = [a]
+        while stack:
+            c = stack.pop()
+            for d in adjacency[c]:
+                if d not in seen:
+                    seen.add(d)
+                    stack.append(d)
+        return sorted(seen)
+
+
+# Column-stored edge attributes
+###############################
+
+_MISSING = object()  # missing value in 'object' columns
+
+
+class EdgeColumns:
+    """
+    edges attributes stored by column, one row per edge (see create_graph(columnar=True)).
+
+    A column is an int64 or float64 array while all its values are numbers given when the edges are created,
+    codes into a table of distinct strings for text values (e.g. SIF relationship types),
+    or a plain list otherwise. The adjacency only holds the row number of each edge ({ neighbour : row },
+    see _ColumnarNeighbours): the EdgeView giving dictionary access to the attributes is created when
+    the edge is read, so no per-edge object is kept.
+    """
+
+    def __init__(self):
+        self.columns = {}  # { name : [kind, values, distinct strings, { string : code }] }
+        self.size = 0
+
+    def add(self, attributes):
+        """
+        add a row with attributes (dictionary), returns its row number
+        """
+        row = self.size
+        self.size += 1
+        for name, column in self.columns.items():
+            if column[0] == 'category':
+                column[1].append(-1)
+            elif column[0] == 'object':
+                column[1].append(_MISSING)
+            elif name in attributes:
+                column[1].append(0)  # set below
+            else:  # arrays can not store missing values
+                self._convert(column, 'object')
+                column[1].append(_MISSING)
+        for name, value in attributes.items():
+            self.set(row, name, value)
+        return row
+
+    def _convert(self, column, kind):
+        """
+        change the storage of column to kind ('float' or 'object')
+        """
+        if column[0] == kind:
+            return
+        if kind == 'float':
+            column[1] = array('d', column[1])
+        else:
+            column[1] = [self._decode(column, x) for x in column[1]]
+            column[2] = column[3] = None
+        column[0] = kind
+
+    def _decode(self, column, x):
+        if column[0] == 'category':
+            return column[2][x] if x >= 0 else _MISSING
+        return x
+
+    def get(self, row, name):
+        column = self.columns.get(name)
+        value = _MISSING if column is None else self._decode(column, column[1][row])
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    def set(self, row, name, value):
+        kind = _value_kind(value)
+        if name not in self.columns:  # new column, missing for the other rows
+            if kind in ('int', 'float') and self.size > 1:
+                kind = 'object'
+            column = self.columns[name] = _new_column(kind)
+            column[1].extend([{'category': -1, 'object': _MISSING}.get(kind, 0)] * self.size)
+        column = self.columns[name]
+        if column[0] != kind and not (column[0] == 'float' and kind == 'int'):
+            self._convert(column, 'float' if {column[0], kind} == {'int', 'float'} else 'object')
+        if column[0] == 'category':
+            if value not in column[3]:
+                column[3][value] = len(column[2])
+                column[2].append(value)
+            column[1][row] = column[3][value]
+        else:
+            column[1][row] = value
+
+    def delete(self, row, name):
+        self.get(row, name)  # KeyError if missing
+        column = self.columns[name]
+        if column[0] == 'category':
+            column[1][row] = -1
+        else:
+            self._convert(column, 'object')
+            column[1][row] = _MISSING
+
+    def names(self, row):
+        """
+        names of the attributes of row
+        """
+        for name, column in self.columns.items():
+            if self._decode(column, column[1][row]) is not _MISSING:
+                yield name
+
+
+def _value_kind(value):
+    if type(value) is int:
+        return 'int' if -2 ** 63 <= value < 2 ** 63 else 'object'  # int64 array range
+    if type(value) is float:
+        return 'float'
+    if type(value) is str:
+        return 'category'
+    return 'object'
+
+
+def _new_column(kind):
+    if kind == 'category':
+        return [kind, array('i'), [], {}]
+    if kind == 'int':
+        return [kind, array('q'), None, None]
+    if kind == 'float':
+        return [kind, array('d'), None, None]
+    return [kind, [], None, None]
+
+
+class EdgeView(MutableMapping):
+    """
+    dictionary-like view on the attributes of an edge stored in EdgeColumns
+    """
+    __slots__ = ('_columns', '_row')
+
+    def __init__(self, columns, row):
+        self._columns = columns
+        self._row = row
+
+    def __getitem__(self, name):
+        return self._columns.get(self._row, name)
+
+    def __setitem__(self, name, value):
+        self._columns.set(self._row, name, value)
+
+    def __delitem__(self, name):
+        self._columns.delete(self._row, name)
+
+    def __iter__(self):
+        return self._columns.names(self._row)
+
+    def __len__(self):
+        return sum(1 for name in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _ColumnarNeighbours(MutableMapping):
+    """
+    { neighbour : edge attributes } of a node in a columnar graph, storing the row of each edge in EdgeColumns
+    and returning an EdgeView on it when the edge is read
+    """
+    __slots__ = ('_columns', '_rows')
+
+    def __init__(self, columns):
+        self._columns = columns
+        self._rows = {}  # { neighbour : row }
+
+    def __getitem__(self, v):
+        return EdgeView(self._columns, self._rows[v])
+
+    def __setitem__(self, v, attributes):
+        if type(attributes) is EdgeView and attributes._columns is self._columns:  # same edge, e.g. both ways
+            self._rows[v] = attributes._row
+        else:
+            self._rows[v] = self._columns.add(attributes)
+
+    def __delitem__(self, v):
+        del self._rows[v]
+
+    def __contains__(self, v):
+        return v in self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+# Ranking and random walks
+##########################
+
+def _transition(G, weight=None):
+    """
+    frozen graph of G (see freeze()) and the transition probability of each of its edges
+    (edge weight divided by the sum of the weights of the edges leaving the same node, 1/out-degree if no weight)
+    """
+    if 'offsets' in G:
+        F = G
+        if weight is not None and F['weights'] is None:
+            raise Exception("frozen graph has no weights, use freeze(g, w)")
+    else:
+        F = freeze(G, weight) if weight is not None else freeze(G)
+    offsets, weights = F['offsets'], F['weights'] if weight is not None else None
+    probability = array('d', bytes(8 * len(F['targets'])))
+    for u in range(len(offsets) - 1):
+        start, end = offsets[u], offsets[u + 1]
+        if weights is None:
+            total = end - start
+            for j in range(start, end):
+                probability[j] = 1 / total
+        else:
+            total = 0.0
+            for j in range(start, end):
+                if weights[j] < 0:
+                    raise Exception("negative weight on edge from %s" % F['ids'][u])
+                total += weights[j]
+            for j in range(start, end):
+                probability[j] = weights[j] / total if total > 0 else 1 / (end - start)
+    return F, probability
+
+
+def _restart_vector(F, personalization):
+    """
+    restart probabilities of the nodes of frozen graph F: uniform if personalization is None,
+    otherwise from { node : weight } or an iterable of nodes (same weight), normalized to sum to 1
+    """
+    n = len(F['ids'])
+    if personalization is None:
+        return [1 / n] * n
+    if not isinstance(personalization, dict):
+        personalization = dict.fromkeys(personalization, 1)
+    index = F['index'] if F['index'] is not None else {v: i for i, v in enumerate(F['ids'])}
+    total = sum(personalization.values())
+    if total <= 0:
+        raise Exception("personalization weights should sum to a positive value")
+    restart = [0.0] * n
+    for node, value in personalization.items():
+        restart[index[node]] = value / total
+    return restart
+
+
+def _power_iteration(F, probability, damping, restarts, tol, max_iter):
+    """
+    PageRank power iteration of several restart vectors at once: the ranks are stored node by node
+    (rank of vector i of the batch at node u in current[u * b + i]) so that each edge is read once per
+    iteration for all the vectors, and a vector leaves the batch as soon as it converges.
+    dangling nodes (no outgoing edge) send their rank back to the restart vector.
+    returns the rank lists, and the number of iterations and last L1 change of each vector.
+    """
+    if numpy is not None:
+        return _power_iteration_numpy(F, probability, damping, restarts, tol, max_iter)
+    offsets, targets = F['offsets'], F['targets']
+    n = len(offsets) - 1
+    ranks = [list(restart) for restart in restarts]
+    iterations, deltas = [0] * len(restarts), [float("inf")] * len(restarts)
+    active = list(range(len(restarts))) if max_iter > 0 else []
+    while active:
+        b = len(active)
+        current = [ranks[k][u] for u in range(n) for k in active]
+        new = [0.0] * (n * b)
+        dangling = [0.0] * b
+        for u in range(n):
+            start, end = offsets[u], offsets[u + 1]
+            row = current[u * b:(u + 1) * b]
+            if start == end:
+                for i in range(b):
+                    dangling[i] += row[i]
+                continue
+            row = [damping * r for r in row]
+            if b == 1:
+                r = row[0]
+                for j in range(start, end):
+                    new[targets[j]] += r * probability[j]
+                continue
+            for j in range(start, end):
+                p, base = probability[j], targets[j] * b
+                for i in range(b):
+                    new[base + i] += row[i] * p
+        running = []
+        for i, k in enumerate(active):
+            teleport = 1 - damping + damping * dangling[i]
+            restart, rank = restarts[k], ranks[k]
+            new_rank = [new[u * b + i] + teleport * restart[u] for u in range(n)]
+            deltas[k] = sum(abs(a - c) for a, c in zip(new_rank, rank))
+            ranks[k] = new_rank
+            iterations[k] += 1
+            if deltas[k] >= tol and iterations[k] < max_iter:
+                running.append(k)
+        active = running
+    return ranks, iterations, deltas
+
+
+def _power_iteration_numpy(F, probability, damping, restarts, tol, max_iter):
+    """
+    _power_iteration() with NumPy: an iteration gathers the ranks of the edge sources and sums them by target
+    with numpy.bincount(), the edge arrays being built once for the batch
+    """
+    offsets = numpy.frombuffer(F['offsets'], dtype=numpy.int64)
+    n = len(offsets) - 1
+    out_degree = numpy.diff(offsets)
+    sources = numpy.repeat(numpy.arange(n), out_degree)
+    targets = numpy.frombuffer(F['targets'], dtype=numpy.int32)
+    edge_factor = damping * numpy.frombuffer(probability, dtype=numpy.float64)
+    dangling = out_degree == 0
+    ranks, iterations, deltas = [], [], []
+    for restart in restarts:  # a vector runs until it converges, sharing the edge arrays with the batch
+        restart = numpy.array(restart, dtype=numpy.float64)
+        rank, iteration, delta = restart, 0, float("inf")
+        while iteration < max_iter and delta >= tol:
+            new_rank = numpy.bincount(targets, weights=rank[sources] * edge_factor, minlength=n)
+            new_rank += (1 - damping + damping * rank[dangling].sum()) * restart
+            delta = float(numpy.abs(new_rank - rank).sum())
+            rank = new_rank
+            iteration += 1
+        ranks.append(rank)
+        iterations.append(iteration)
+        deltas.append(delta)
+    return [rank.tolist() for rank in ranks], iterations, deltas
+
+
+def pagerank(G, damping=0.85, personalization=None, weight=None, tol=1e-10, max_iter=100, personalizations=None):
+    """
+    PageRank by power iteration over the compact transition of the graph (see freeze()), built once per call.
+
+    :param G: Graph or frozen graph
+    :param damping: probability to follow an edge rather than to restart
+    :param personalization: restart distribution, None for uniform, { node : weight } or an iterable of nodes
+    :param weight: weight attribute of the edges (transition proportional to the weight), None for unweighted
+    :param tol: convergence threshold on the L1 change of the ranks between two iterations
+    :param max_iter: maximum number of iterations
+    :param personalizations: list of restart distributions (same forms as personalization) computed as one batch,
+        reading the edges once per iteration for all of them, instead of personalization
+    :return: Dictionary with:
+        'rank': { node : rank } (summing to 1)
+        'iterations': number of iterations
+        'delta': last L1 change
+        'converged': True if delta < tol
+        each being a list (one item per restart distribution) if personalizations is given
+    """
+    if personalization is not None and personalizations is not None:
+        raise Exception("give either personalization or personalizations")
+    F, probability = _transition(G, weight)
+    batch = personalizations is not None
+    if not F['ids']:  # empty graph: nothing to rank
+        restarts = personalizations if batch else [personalization]
+        ranks, iterations, deltas = [[] for p in restarts], [0] * len(restarts), [0.0] * len(restarts)
+    else:
+        restarts = [_restart_vector(F, p) for p in (personalizations if batch else [personalization])]
+        ranks, iterations, deltas = _power_iteration(F, probability, damping, restarts, tol, max_iter)
+    ids = F['ids']
+    result = {'rank': [dict(zip(ids, rank)) for rank in ranks], 'iterations': iterations, 'delta': deltas,
+              'converged': [delta < tol for delta in deltas]}
+    return result if batch else {key: values[0] for key, values in result.items()}
+
+
+def random_walk_with_restart(G, seed_sets, restart=0.15, weight=None, tol=1e-10, max_iter=100):
+    """
+    random walk with restart (personalized PageRank) from many seed sets, computed as one batch.
+
+    :param G: Graph or frozen graph
+    :param seed_sets: list of seed sets, each an iterable of nodes or { node : weight }
+    :param restart: probability to jump back to the seeds at each step
+    :param weight: weight attribute of the edges, None for unweighted
+    :return: same dictionary as pagerank() with personalizations, 'rank' being the list of the
+        { node : visiting probability } of each seed set
+    """
+    return pagerank(G, 1 - restart, weight=weight, tol=tol, max_iter=max_iter, personalizations=list(seed_sets))
+
+
+# Centrality
+############
+
+def _Brandes(F, sources, weighted):
+    """
+    Brandes dependency accumulation on frozen graph F from integer nodes sources.
+    returns the list of the partial betweenness of each node.
+    """
+    offsets, targets, weights = F['offsets'], F['targets'], F['weights']
+    n = len(offsets) - 1
+    centrality = [0.0] * n
+    for s in sources:
+        sigma = [0] * n  # number of shortest paths from s
+        predecessors = [[] for i in range(n)]
+        order = []  # nodes by non-decreasing distance from s
+        sigma[s] = 1
+        if weighted:
+            distance = [float("inf")] * n
+            distance[s] = 0
+            done = [False] * n
+            heap = [(0, s, s)]
+            while heap:
+                d, u, p = heapq.heappop(heap)
+                if done[u]:  # outdated heap entry
+                    continue
+                done[u] = True
+                order.append(u)
+                for j in range(offsets[u], offsets[u + 1]):
+                    v, dv = targets[j], d + weights[j]
+                    if dv < distance[v]:
+                        distance[v] = dv
+                        sigma[v] = sigma[u]
+                        predecessors[v] = [u]
+                        heapq.heappush(heap, (dv, v, u))
+                    elif dv == distance[v] and not done[v]:
+                        sigma[v] += sigma[u]
+                        predecessors[v].append(u)
+        else:
+            distance = [-1] * n
+            distance[s] = 0
+            Q = deque([s])
+            while Q:
+                u = Q.popleft()
+                order.append(u)
+                d = distance[u] + 1
+                for v in targets[offsets[u]:offsets[u + 1]]:
+                    if distance[v] < 0:  # if unvisited
+                        distance[v] = d
+                        Q.append(v)
+                    if distance[v] == d:  # u is on a shortest path to v
+                        sigma[v] += sigma[u]
+                        predecessors[v].append(u)
+        delta = [0.0] * n
+        for v in reversed(order):
+            coefficient = (1 + delta[v]) / sigma[v]
+            for u in predecessors[v]:
+                delta[u] += sigma[u] * coefficient
+            if v != s:
+                centrality[v] += delta[v]
+    return centrality
+
+
+def _worker_Brandes(sources, weighted):
+    return _Brandes(_worker_graph[0], sources, weighted)
+
+
+def betweenness(G, weight=None, k=None, workers=None, normalized=False, seed=None):
+    """
+    betweenness centrality (Brandes), the sources being spread over a pool of worker processes
+    sharing a read-only frozen copy of the graph (see share()).
+
+    :param G: Graph or frozen graph (see freeze())
+    :param weight: weight attribute (non-negative) for weighted shortest paths, None for unweighted
+    :param k: if given, approximation from k sampled sources (pivots), scaled to the number of nodes
+    :param workers: number of worker processes (default: number of CPUs, 1 runs in the current process)
+    :param normalized: if True, divided by the number of pairs of other nodes
+    :param seed: random seed of the pivots sampling
+    :return: Dictionary { node : betweenness }
+    """
+    if 'offsets' in G:
+        F = G
+        if weight is not None and F['weights'] is None:
+            raise Exception("frozen graph has no weights, use freeze(g, w)")
+    else:
+        F = freeze(G, weight) if weight is not None else freeze(G)
+    weighted = weight is not None
+    if weighted and any(w < 0 for w in F['weights']):
+        raise Exception("betweenness() needs non-negative weights")
+    n = len(F['ids'])
+    sources = list(range(n))
+    if k is not None and k < n:
+        sources = random.Random(seed).sample(sources, k)
+
+    if workers is None:
+        workers = os.cpu_count()
+    if workers <= 1 or len(sources) <= 1:
+        centrality = _Brandes(F, sources, weighted)
+    else:
+        chunks = [sources[i::workers * 4] for i in range(min(len(sources), workers * 4))]
+        shm, snapshot = share(F)
+        executor = ProcessPoolExecutor(workers, initializer=_attach_worker, initargs=(snapshot,))
+        try:
+            centrality = [0.0] * n
+            for partial in _ordered_results(executor, _worker_Brandes, [(chunk, weighted) for chunk in chunks],
+                                            2 * workers):
+                for i, value in enumerate(partial):
+                    centrality[i] += value
+        finally:
+            executor.shutdown(cancel_futures=True)
+            shm.close()
+            shm.unlink()
+
+    scale = n / len(sources) if sources else 1
+    if not F['directed']:
+        scale /= 2  # each pair counted from both ends
+    if normalized and n > 2:
+        scale /= (n - 1) * (n - 2) / (1 if F['directed'] else 2)
+    return {node: value * scale for node, value in zip(F['ids'], centrality)}
+
+
+# Distance oracle
+#################
+
+_ORACLE_MAGIC = b'GSLORCL\0'
+_ORACLE_VERSION = 1
+
+
+class DistanceOracle:
+    """
+    approximate distances from the exact distances between a few landmarks and every node:
+    for any landmark l, |d(l, v) - d(l, u)| and d(u, l) - d(v, l) are lower bounds of d(u, v)
+    and d(u, l) + d(l, v) an upper bound (triangle inequality).
+
+    distances are stored in float arrays, node-major (the k landmarks distances of node i at [i * k:(i + 1) * k]):
+        forward: distance from each landmark to the node
+        backward: distance from the node to each landmark (same array as forward for undirected graphs)
+    """
+
+    def __init__(self, G, n_landmarks=16, strategy='degree', weight=None, seed=None):
+        """
+        :param G: Graph or frozen graph (see freeze())
+        :param n_landmarks: number of landmarks
+        :param strategy: 'degree' (highest degree nodes) or 'random' landmarks
+        :param weight: weight attribute (non-negative) for weighted distances, None for number of edges
+        :param seed: random seed of the 'random' strategy
+        """
+        if 'offsets' in G:
+            F = G
+            if weight is not None and F['weights'] is None:
+                raise Exception("frozen graph has no weights, use freeze(g, w)")
+        else:
+            F = freeze(G, weight) if weight is not None else freeze(G)
+        if weight is not None and any(w < 0 for w in F['weights']):
+            raise Exception("DistanceOracle needs non-negative weights")
+        self.F, self.weight = F, weight
+        self.ids = F['ids']
+        self.index = F['index'] if F['index'] is not None else {n: i for i, n in enumerate(self.ids)}
+        self.directed = F['directed']
+        n = len(self.ids)
+        offsets = F['offsets']
+        if strategy == 'degree':
+            degree = [offsets[i + 1] - offsets[i] for i in range(n)]
+            if self.directed:
+                for v in F['targets']:
+                    degree[v] += 1
+            landmarks = sorted(range(n), key=lambda i: -degree[i])[:n_landmarks]
+        elif strategy == 'random':
+            landmarks = random.Random(seed).sample(range(n), min(n_landmarks, n))
+        else:
+            raise Exception("unknown landmarks strategy %s" % strategy)
+        self.landmarks = landmarks
+        self.forward = self._distances(F, landmarks)
+        if self.directed:
+            self.backward = self._distances(F['reverse'] if 'reverse' in F else transpose(F), landmarks)
+        else:
+            self.backward = self.forward
+
+    def _distances(self, F, landmarks):
+        """
+        node-major array of the distances from each landmark in F
+        """
+        inf = float("inf")
+        k, n = len(landmarks), len(self.ids)
+        distances = array('d', bytes(8 * k * n))
+        for l, src in enumerate(landmarks):
+            if self.weight is not None:
+                distance = _frozen_Dijkstra(F, src)[0]
+            else:
+                distance = [d if d >= 0 else inf for d in _BFS_distances(F, [src])[0]]
+            distances[l::k] = array('d', distance)
+        return distances
+
+    def estimate(self, u, v):
+        """
+        (lower bound, upper bound) of the distance from u to v, inf if v can not be reached from u
+        """
+        if u == v:
+            return 0, 0
+        k = len(self.landmarks)
+        i, j = self.index[u] * k, self.index[v] * k
+        inf = float("inf")
+        lower, upper = 0, inf
+        for from_u, to_u, from_v, to_v in zip(self.forward[i:i + k], self.backward[i:i + k],
+                                              self.forward[j:j + k], self.backward[j:j + k]):
+            # from_x: d(landmark, x), to_x: d(x, landmark)
+            if to_u + from_v < upper:
+                upper = to_u + from_v
+            if from_u < inf and from_v - from_u > lower:  # d(l, v) <= d(l, u) + d(u, v)
+                lower = from_v - from_u
+            if to_v < inf and to_u - to_v > lower:  # d(u, l) <= d(u, v) + d(v, l)
+                lower = to_u - to_v
+            if not self.directed and from_u - from_v > lower:
+                lower = from_u - from_v
+        return lower, upper
+
+    def distance(self, u, v):
+        """
+        distance from u to v: estimate() if its bounds are equal, otherwise an exact search
+        (needs the graph, see load())
+        """
+        lower, upper = self.estimate(u, v)
+        if lower == upper:
+            return lower
+        if self.F is None:
+            raise Exception("no graph attached to the oracle for exact search")
+        if self.weight is not None:
+            return _frozen_Dijkstra(self.F, self.index[u])[0][self.index[v]]
+        d = _BFS_distances(self.F, [self.index[u]])[0][self.index[v]]
+        return d if d >= 0 else float("inf")
+
+    def save(self, path):
+        """
+        write the oracle in a binary file: magic, version and header size, JSON header, then the distances arrays
+        """
+        head = json.dumps({'ids': self.ids, 'landmarks': self.landmarks, 'directed': self.directed,
+                           'weight': self.weight}).encode()
+        with open(path, 'wb') as f:
+            f.write(_ORACLE_MAGIC)
+            f.write(array('I', [_ORACLE_VERSION, len(head)]).tobytes())
+            f.write(head)
+            f.write(self.forward.tobytes())
+            if self.directed:
+                f.write(self.backward.tobytes())
+
+    @classmethod
+    def load(cls, path, G=None):
+        """
+        read an oracle written by save(). G (Graph or frozen graph) is only needed for exact searches in distance().
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(_ORACLE_MAGIC)) != _ORACLE_MAGIC:
+                raise Exception("%s is not a distance oracle" % path)
+            version, size = array('I', f.read(8))
+            if version != _ORACLE_VERSION:
+                raise Exception("unsupported distance oracle version %s in %s" % (version, path))
+            header = json.loads(f.read(size))
+            data = array('d', f.read())
+        oracle = cls.__new__(cls)
+        oracle.ids, oracle.landmarks = header['ids'], header['landmarks']
+        oracle.directed, oracle.weight = header['directed'], header['weight']
+        oracle.index = {n: i for i, n in enumerate(oracle.ids)}
+        size = len(oracle.ids) * len(oracle.landmarks)
+        oracle.forward = data[:size]
+        oracle.backward = data[size:] if oracle.directed else oracle.forward
+        oracle.F = None
+        if G is not None:
+            oracle.F = G if 'offsets' in G else freeze(G, oracle.weight) if oracle.weight is not None else freeze(G)
+        return oracle
+
+
+# Instrumentation
+#################
+
+_profilers = []  # active Profile objects (see profile())
+_profile_callbacks = []  # functions called with the CallStats of each instrumented call
+
+
+class CallStats:
+    """
+    events counted during one call of an instrumented search (BFS(), DFS_events() and DFS(), Bellman_Ford()):
+        algorithm: name of the search
+        nodes_expanded: nodes whose edges were scanned (counted once per pass for Bellman_Ford)
+        pushes: nodes added to the queue or stack
+        relaxations: distance improvements (shortest paths)
+        edges_scanned: edges looked at
+        peak_frontier: largest queue or stack size
+        iterations: passes over all the edges (Bellman_Ford without queue)
+        wall_time, cpu_time: seconds (including the time spent by the consumer of DFS_events())
+        peak_memory: peak of allocated bytes during the call, None if memory is not traced
+    """
+    __slots__ = ('algorithm', 'nodes_expanded', 'pushes', 'relaxations', 'edges_scanned', 'peak_frontier',
+                 'iterations', 'wall_time', 'cpu_time', 'peak_memory', '_memory')
+
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+        self.nodes_expanded = self.pushes = self.relaxations = self.edges_scanned = 0
+        self.peak_frontier = self.iterations = 0
+        self.wall_time = self.cpu_time = 0.0
+        self.peak_memory = None
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if not name.startswith('_')}
+
+    def __repr__(self):
+        return 'CallStats(%s)' % ', '.join('%s=%r' % item for item in self.as_dict().items())
+
+
+def _start_call(algorithm):
+    stats = CallStats(algorithm)
+    if tracemalloc.is_tracing():
+        stats._memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    stats.wall_time, stats.cpu_time = time.perf_counter(), time.process_time()
+    return stats
+
+
+def _finish_call(stats, **counts):
+    """
+    take the times and memory peak of the call, then set the counts kept in local variables by the search
+    and report stats
+    """
+    wall_time, cpu_time = time.perf_counter(), time.process_time()
+    if tracemalloc.is_tracing() and hasattr(stats, '_memory'):
+        stats.peak_memory = max(0, tracemalloc.get_traced_memory()[1] - stats._memory)
+    stats.wall_time = wall_time - stats.wall_time
+    stats.cpu_time = cpu_time - stats.cpu_time
+    for name, value in counts.items():
+        setattr(stats, name, value)
+    for profiler in _profilers:
+        profiler.calls.append(stats)
+    for callback in _profile_callbacks:
+        callback(stats)
+
+
+class Profile:
+    """
+    collects the CallStats of the instrumented searches called inside a with block (see profile())
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.calls = []
+        self._tracing = False
+
+    def __enter__(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        _profilers.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _profilers.remove(self)
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+        return False
+
+    def summary(self):
+        """
+        { algorithm : dictionary of the CallStats counters summed over its calls (peaks: maximum), plus 'calls' }
+        """
+        summary = {}
+        for stats in self.calls:
+            total = summary.setdefault(stats.algorithm, dict(CallStats(stats.algorithm).as_dict(), calls=0))
+            total['calls'] += 1
+            for name, value in stats.as_dict().items():
+                if name in ('algorithm', 'peak_memory', 'peak_frontier'):
+                    if name != 'algorithm' and value is not None:
+                        total[name] = max(total[name] or 0, value)
+                else:
+                    total[name] += value
+        return summary
+
+
+def profile(memory=False):
+    """
+    context manager recording statistics of the instrumented searches, e.g.
+        with profile(memory=True) as p:
+            BFS(g, 'A')
+        p.calls[0].edges_scanned, p.summary()
+
+    :param memory: if True, peak memory is traced with tracemalloc (slower)
+    :return: Profile whose calls attribute is the list of CallStats
+    """
+    return Profile(memory)
+
+
+def add_profile_callback(callback):
+    """
+    call callback(CallStats) after each instrumented search, until remove_profile_callback()
+    """
+    _profile_callbacks.append(callback)
+
+
+def remove_profile_callback(callback):
+    _profile_callbacks.remove(callback)
@@ -4,6 +4,10 @@ from pprint import pprint
 import GeneOntology as go
 import Graph as gr
 from copy import deepcopy
+import gzip
+import os
+import shutil
+import tempfile
 
 
 print(""" Graph.py file contains functions to 
@@ -163,6 +167,614 @@ if Expected == gr.is_acyclic(GraphTab):
 else:
     print('not ok')
 
+# ~ freeze()
+print('Test freeze() and frozen graph searches')
+FrozenSif = gr.freeze(GraphSif)
+FrozenTab = gr.freeze(GraphTab, 'weight')
+
+if FrozenSif['ids'] == list(GraphSif['nodes']) and len(FrozenSif['targets']) == 9 and list(FrozenTab['weights'][:2]) == [6.0, 7.0]:
+    print('ok')
+else:
+    print('not ok')
+
+if gr.BFS(GraphSif, "underwear") == gr.frozen_BFS(FrozenSif, "underwear") and gr.DFS(GraphTab) == gr.frozen_DFS(FrozenTab):
+    print('ok')
+else:
+    print('not ok')
+
+if gr.Bellman_Ford(BellmanFord, "C", "weight") == gr.frozen_Bellman_Ford(FrozenTab, "C"):
+    print('ok')
+else:
+    print('not ok')
+
+if gr.frozen_topological_sort(FrozenTab) == "Topological sort can not be performed on cyclic graph" and len(gr.frozen_topological_sort(FrozenSif)) == 8:
+    print('ok')
+else:
+    print('not ok')
+
+# ~ shortest_path()
+print('Test shortest_path()')
+Expected = ['underwear', 'trousers', 'belt', 'jacket']
+
+if Expected == gr.shortest_path(GraphSif, 'underwear', 'jacket') and gr.shortest_path(GraphSif, 'underwear', 'shirt') is None and gr.shortest_path(GraphTab, 'C', 'A') == ['C', 'B', 'D', 'A']:
+    print('ok')
+else:
+    print('not ok')
+
+Shortcut = gr.load_SIF('Data_Test/Dressing.sif')
+if gr.shortest_path(Shortcut, 'underwear', 'jacket', reverse=gr.reverse_edges(Shortcut)) == Expected and 'in_edges' not in Shortcut:
+    print('ok')
+else:
+    print('not ok')
+
+# ~ DFS_events()
+print('Test DFS_events() and DFS() outputs')
+Deep = gr.create_graph()
+for i in range(5000):  # longer than the recursion limit
+    gr.add_edge(Deep, i, i + 1)
+Expected = {'last_seen': {'A': 10, 'B': 9, 'C': 4, 'D': 6, 'E': 8}}
+
+if Expected == gr.DFS(GraphTab, outputs=['last_seen']) and gr.DFS(Deep)['time'] == 10002 and gr.topological_sort(Deep)[:3] == [0, 1, 2]:
+    print('ok')
+else:
+    print('not ok')
+
+Expected = [('discover', 'A', None), ('tree edge', 'A', 'B'), ('discover', 'B', 'A'), ('tree edge', 'B', 'C'), ('discover', 'C', 'B'), ('back edge', 'C', 'B')]
+
+if Expected == list(gr.DFS_events(GraphTab))[:6]:
+    print('ok')
+else:
+    print('not ok')
+
+# ~ Dijkstra()
+print('Test Dijkstra(), A_star() and shortest_paths()')
+Positive = gr.create_graph()
+for u, v, weight in [('A', 'B', '4'), ('A', 'C', '1'), ('C', 'B', '2'), ('B', 'D', '1'), ('C', 'D', '5'), ('D', 'E', '3')]:
+    gr.add_edge(Positive, u, v, {'weight': weight})
+Expected = {'distance': {'A': 0, 'B': 3, 'C': 1, 'D': 4, 'E': 7}, 'predecessor': {'A': None, 'B': 'C', 'C': 'A', 'D': 'B', 'E': 'D'}}
+
+if Expected == gr.Dijkstra(Positive, 'A', 'weight') and Expected == gr.Bellman_Ford(Positive, 'A', 'weight'):
+    print('ok')
+else:
+    print('not ok')
+
+Expected = {'distance': 7, 'path': ['A', 'C', 'B', 'D', 'E']}
+
+if Expected == gr.A_star(Positive, 'A', 'E', 'weight', lambda n: 0) and gr.A_star(Positive, 'E', 'A', 'weight', lambda n: 0)['path'] is None:
+    print('ok')
+else:
+    print('not ok')
+
+if gr.shortest_paths(BellmanFord, 'C', 'weight') == gr.Bellman_Ford(BellmanFord, 'C', 'weight') and gr.shortest_paths(Positive, 'A', 'weight')['distance']['E'] == 7:
+    print('ok')
+else:
+    print('not ok')
+
+# ~ Bellman_Ford(queue=True)
+print('Test Bellman_Ford() queue mode and negative cycle')
+Expected = {'distance': {'A': -4, 'B': -2, 'E': 3, 'C': 0, 'D': -6}, 'predecessor': {'A': 'D', 'B': 'C', 'E': 'A', 'C': None, 'D': 'B'}, 'negative_cycle': None}
+
+if Expected == gr.Bellman_Ford(BellmanFord, "C", "weight", queue=True):
+    print('ok')
+else:
+    print('not ok')
+
+Chain = gr.create_graph()
+for n in ('c', 'b', 'a'):  # edges in reverse path order: one pass per edge
+    gr.add_node(Chain, n)
+gr.add_edge(Chain, 'b', 'c', {'weight': 1})
+gr.add_edge(Chain, 'a', 'b', {'weight': 1})
+
+if gr.Bellman_Ford(Chain, 'a', 'weight')['distance'] == gr.Bellman_Ford(Chain, 'a', 'weight', queue=True)['distance'] == {'c': 2, 'b': 1, 'a': 0}:
+    print('ok')
+else:
+    print('not ok')
+
+Negative = gr.create_graph()
+for u, v, weight in [('S', 'A', '1'), ('A', 'B', '2'), ('B', 'C', '-4'), ('C', 'A', '1'), ('C', 'D', '3')]:
+    gr.add_edge(Negative, u, v, {'weight': weight})
+
+if gr.Bellman_Ford(Negative, 'S', 'weight', queue=True)['negative_cycle'] in (['A', 'B', 'C'], ['B', 'C', 'A'], ['C', 'A', 'B']):
+    print('ok')
+else:
+    print('not ok')
+
+# ~ Floyd_Warshall()
+print('Test Floyd_Warshall()')
+Matrix = gr.Floyd_Warshall(BellmanFord, 'weight')
+Expected = gr.Bellman_Ford(BellmanFord, 'C', 'weight')['distance']
+
+if Expected == {n: gr.all_pairs_distance(Matrix, 'C', n) for n in Expected} and gr.all_pairs_path(Matrix, 'C', 'A') == ['C', 'B', 'D', 'A'] and not Matrix['negative_cycle']:
+    print('ok')
+else:
+    print('not ok')
+
+TmpDir = tempfile.mkdtemp()
+Mapped = gr.Floyd_Warshall(BellmanFord, 'weight', filename=os.path.join(TmpDir, 'bellman'))
+
+if list(Mapped['distance']) == list(Matrix['distance']) and os.path.exists(os.path.join(TmpDir, 'bellman.distance')):
+    print('ok')
+else:
+    print('not ok')
+gr.close_all_pairs(Mapped)
+
+# ~ Johnson()
+print('Test Johnson()')
+Expected = {n: gr.Bellman_Ford(BellmanFord, n, 'weight', queue=True)['distance'] for n in BellmanFord['nodes']}
+
+if Expected == {s: paths['distance'] for s, paths in gr.Johnson(BellmanFord, 'weight', workers=1)}:
+    print('ok')
+else:
+    print('not ok')
+
+Pairs = gr.Johnson(BellmanFord, 'weight', workers=2)
+First = next(Pairs)
+Pairs.close()  # pending searches cancelled
+if First == next(gr.Johnson(BellmanFord, 'weight', workers=1)) and Expected == {s: paths['distance'] for s, paths in gr.Johnson(BellmanFord, 'weight', workers=2)}:
+    print('ok')
+else:
+    print('not ok')
+
+# ~ batch_BFS()
+print('Test batch_BFS()')
+Batch = gr.batch_BFS(GraphSif, ['underwear', 'shirt'], workers=1)
+Expected = [-1, -1, -1, 0, 1, 1, 2, -1]  # from shirt, in GraphSif['nodes'] order
+
+if Batch['ids'] == list(GraphSif['nodes']) and list(Batch['distance']['shirt']) == Expected:
+    print('ok')
+else:
+    print('not ok')
+
+Parallel = gr.batch_BFS(GraphSif, list(GraphSif['nodes']), workers=2)
+if all(Parallel['distance'][s] == gr.batch_BFS(GraphSif, [s], workers=1)['distance'][s] for s in GraphSif['nodes']):
+    print('ok')
+else:
+    print('not ok')
+
+Nearest = gr.batch_BFS(GraphSif, ['underwear', 'shirt'], nearest=True)
+Expected = [-1, 1, 1, 0, 1, 1, 2, 0]
+
+if list(Nearest['distance']) == Expected and Nearest['ids'][Nearest['nearest'][Nearest['ids'].index('trousers')]] == 'underwear':
+    print('ok')
+else:
+    print('not ok')
+
+# ~ iter_TAB_edges() and typed, gzipped loading
+print('Test iter_TAB_edges() and load_TAB() with gzip and types')
+Expected = [('A', 'B', {'weight': 6.0}), ('A', 'E', {'weight': 7.0})]
+
+if Expected == list(gr.iter_TAB_edges('Data_Test/Bellman.tab', types={'weight': float}))[:2]:
+    print('ok')
+else:
+    print('not ok')
+
+with open('Data_Test/Bellman.tab', 'rb') as f_in, gzip.open(os.path.join(TmpDir, 'Bellman.tab.gz'), 'wb') as f_out:
+    shutil.copyfileobj(f_in, f_out)
+Typed = gr.load_TAB(os.path.join(TmpDir, 'Bellman.tab.gz'), tweight_attribute='weight', types={'weight': int})
+
+if Typed['weight_attribute'] == 'weight' and Typed['edges']['B']['D'] == {'weight': -4} and Typed['nb_edges'] == 10:
+    print('ok')
+else:
+    print('not ok')
+
+# ~ save_snapshot() and load_snapshot()
+print('Test save_snapshot() and load_snapshot()')
+gr.save_snapshot(Typed, os.path.join(TmpDir, 'Bellman.snapshot'))
+Snapshot = gr.load_snapshot(os.path.join(TmpDir, 'Bellman.snapshot'))
+
+if gr.frozen_Bellman_Ford(Snapshot, 'C') == gr.Bellman_Ford(BellmanFord, 'C', 'weight') and gr.edge_attributes(Snapshot, 'B', 'D') == {'weight': -4}:
+    print('ok')
+else:
+    print('not ok')
+
+if gr.thaw(Snapshot) == Typed:
+    print('ok')
+else:
+    print('not ok')
+gr.close_snapshot(Snapshot)
+
+Huge = gr.create_graph()
+gr.add_edge(Huge, 'A', 'B', {'id': 2 ** 70, 'rank': 1})
+gr.save_snapshot(Huge, os.path.join(TmpDir, 'Huge.snapshot'))
+Snapshot = gr.load_snapshot(os.path.join(TmpDir, 'Huge.snapshot'), use_mmap=False)
+Lazy = 'ids' not in Snapshot and 'index' not in Snapshot
+if Lazy and gr.edge_attributes(Snapshot, 'A', 'B') == {'id': 2 ** 70, 'rank': 1} and Snapshot['columns']['id'][0] == 'json':
+    print('ok')
+else:
+    print('not ok')
+gr.close_snapshot(Snapshot)
+
+# ~ Kahn()
+print('Test Kahn() layers and cycle')
+Expected = {'order': ['socks', 'shirt', 'underwear', 'tie', 'trousers', 'shoes', 'belt', 'jacket'],
+            'layers': [['socks', 'shirt', 'underwear'], ['tie', 'trousers'], ['shoes', 'belt'], ['jacket']],
+            'cycle': None}
+
+if Expected == gr.Kahn(GraphSif, layers=True) and gr.Kahn(GraphTab)['cycle'] == ['C', 'B', 'E', 'D']:
+    print('ok')
+else:
+    print('not ok')
+
+Done = []
+gr.run_layers(GraphSif, Done.append, workers=2)
+
+if all(Done.index(u) < Done.index(v) for u in GraphSif['edges'] for v in GraphSif['edges'][u]):
+    print('ok')
+else:
+    print('not ok')
+
+# ~ strongly_connected_components() and condensation()
+print('Test strongly_connected_components() and condensation()')
+Expected = [['E', 'D', 'C', 'B', 'A']]
+
+if Expected == gr.strongly_connected_components(GraphTab) and len(gr.strongly_connected_components(FrozenSif)) == 8:
+    print('ok')
+else:
+    print('not ok')
+
+Loops = gr.create_graph()
+for u, v in [('A', 'B'), ('B', 'A'), ('B', 'C'), ('C', 'D'), ('D', 'C')]:
+    gr.add_edge(Loops, u, v)
+Condensed = gr.condensation(Loops)
+Expected = {0: {1: {}}, 1: {}}
+
+if Expected == Condensed['edges'] and sorted(Condensed['nodes'][0]['members']) == ['A', 'B'] and Condensed['component']['D'] == 1:
+    print('ok')
+else:
+    print('not ok')
+
+# ~ connected_components() and disjoint sets
+print('Test connected_components() and track_components()')
+Undirected = gr.load_SIF('Data_Test/Dressing.sif', directed=False, components=True)
+gr.add_edge(Undirected, 'hat', 'scarf')
+Expected = [['socks', 'shoes', 'trousers', 'shirt', 'tie', 'belt', 'jacket', 'underwear'], ['hat', 'scarf']]
+
+if Expected == gr.connected_components(Undirected) and Undirected['components']['nb_sets'] == 2:
+    print('ok')
+else:
+    print('not ok')
+
+Sets = gr.ds_add_edges(gr.create_disjoint_set(), gr.iter_TAB_edges('Data_Test/Bellman.tab'))
+
+if Sets['nb_sets'] == 1 and gr.ds_find(Sets, 'A') == gr.ds_find(Sets, 'D'):
+    print('ok')
+else:
+    print('not ok')
+
+# ~ ReachabilityIndex
+print('Test ReachabilityIndex')
+for max_bitset in (20000, 0):  # bitsets, then interval labels
+    Reachability = gr.ReachabilityIndex(GraphSif, max_bitset=max_bitset)
+    if Reachability.reaches('underwear', 'jacket') and not Reachability.reaches('jacket', 'underwear') and not Reachability.reaches('socks', 'shirt') \
+            and sorted(Reachability.descendants('trousers')) == ['belt', 'jacket', 'shoes', 'trousers'] \
+            and sorted(Reachability.ancestors('belt')) == ['belt', 'shirt', 'trousers', 'underwear']:
+        print('ok')
+    else:
+        print('not ok')
+
+# ~ cached_BFS() and cached_shortest_paths()
+print('Test cached_BFS() and cached_shortest_paths()')
+Cached = gr.load_TAB('Data_Test/Bellman.tab')
+First = gr.cached_shortest_paths(Cached, 'C', 'weight')
+
+if First is gr.cached_shortest_paths(Cached, 'C', 'weight') and gr.cached_BFS(Cached, 'A') == gr.BFS(Cached, 'A'):
+    print('ok')
+else:
+    print('not ok')
+
+gr.add_edge(Cached, 'A', 'F', {'weight': '1'})
+
+if gr.cached_shortest_paths(Cached, 'C', 'weight')['distance']['F'] == -3 and gr.cache_info()['entries'] == 1:
+    print('ok')
+else:
+    print('not ok')
+
+Other = gr.load_TAB('Data_Test/Bellman.tab')
+gr.cached_BFS(Other, 'A')
+Entries = gr.cache_info()['entries']
+gr.add_node(Other, 'G')  # results of Other dropped at once
+del Other
+if Entries == 2 and gr.cache_info()['entries'] == 1 and gr.cache_info()['graphs'] == 1:
+    print('ok')
+else:
+    print('not ok')
+gr.clear_cache()
+
+# ~ DynamicShortestPaths
+print('Test DynamicShortestPaths')
+Dynamic = gr.load_TAB('Data_Test/Bellman.tab', types={'weight': int})
+Paths = gr.DynamicShortestPaths(Dynamic, 'C', 'weight')
+Paths.insert_edge('A', 'F', {'weight': 2})
+Paths.insert_edge('B', 'F', {'weight': -1})
+Paths.decrease_weight('A', 'F', -5)
+
+if Paths.result() == gr.Bellman_Ford(Dynamic, 'C', 'weight') and Paths.distance['F'] == -9:
+    print('ok')
+else:
+    print('not ok')
+
+Paths.delete_edge('A', 'F')
+
+if Paths.result() == gr.Bellman_Ford(Dynamic, 'C', 'weight') and Paths.predecessor['F'] == 'B' and Dynamic['nb_edges'] == 11:
+    print('ok')
+else:
+    print('not ok')
+
+Before = gr.cached_shortest_paths(Dynamic, 'C', 'weight', algorithm='Bellman_Ford')['distance']['D']
+Paths.decrease_weight('B', 'D', 10)  # increase: subtree below B -> D recomputed
+
+if Paths.result()['distance'] == gr.Bellman_Ford(Dynamic, 'C', 'weight')['distance'] and Before == -6 \
+        and gr.cached_shortest_paths(Dynamic, 'C', 'weight', algorithm='Bellman_Ford')['distance']['D'] == Paths.distance['D'] == 8:
+    print('ok')
+else:
+    print('not ok')
+
+# ~ add_edges() and interning
+print('Test add_edges() with attribute columns and interning')
+Bulk = gr.create_graph()
+Interner = gr.create_interner()
+Added = gr.add_edges(Bulk, zip(['A', 'A', 'B', 'A'], ['B', 'C', 'C', 'B']), attributes={'weight': [1, 2, 3, 4]}, interner=Interner)
+Expected = {0: {1: {'weight': 1}, 2: {'weight': 2}}, 1: {2: {'weight': 3}}, 2: {}}
+
+if Added == 3 and Expected == Bulk['edges'] and Bulk['nb_edges'] == 3 and Interner['ids'] == ['A', 'B', 'C']:
+    print('ok')
+else:
+    print('not ok')
+
+Shared = {'kind': 'pp'}
+Reused = gr.create_graph()
+gr.add_edges(Reused, [('a', 'b', Shared), ('c', 'd', Shared)], attributes={'w': [1, 2]})
+if Reused['edges']['a']['b'] == {'kind': 'pp', 'w': 1} and Reused['edges']['c']['d'] == {'kind': 'pp', 'w': 2} and Shared == {'kind': 'pp'}:
+    print('ok')
+else:
+    print('not ok')
+
+# ~ columnar edge attributes
+print('Test columnar edge attributes (EdgeColumns)')
+ColumnarSif = gr.load_SIF('Data_Test/Dressing.sif', columnar=True)
+ColumnarTab = gr.load_TAB('Data_Test/Bellman.tab', types={'weight': int}, columnar=True)
+
+if ColumnarSif['edges'] == GraphSif['edges'] and ColumnarSif['edge_columns'].columns['type'][2] == ['before'] and gr.Bellman_Ford(ColumnarTab, 'C', 'weight') == gr.Bellman_Ford(BellmanFord, 'C', 'weight'):
+    print('ok')
+else:
+    print('not ok')
+
+Edge = gr.add_edge(ColumnarTab, 'A', 'F')
+Edge['type'] = 'new'
+ColumnarTab['edges']['A']['B']['weight'] = 1.5
+
+if dict(Edge) == {'type': 'new'} and ColumnarTab['edges']['A']['B'] == {'weight': 1.5} and 'type' not in ColumnarTab['edges']['A']['E']:
+    print('ok')
+else:
+    print('not ok')
+
+Wide = gr.create_graph(columnar=True)
+gr.add_edge(Wide, 'A', 'B', {'id': 2 ** 70})
+gr.add_edge(Wide, 'B', 'C', {'id': 3})
+if Wide['edges']['A']['B'] == {'id': 2 ** 70} and Wide['edges']['B']['C'] == {'id': 3} and Wide['edge_columns'].columns['id'][0] == 'object':
+    print('ok')
+else:
+    print('not ok')
+
+Rows = gr.create_graph(directed=False, columnar=True)
+gr.add_edges(Rows, [('A', 'B', {'w': 1}), ('B', 'C', {'w': 2})])
+Rows['edges']['B']['A']['w'] = 5  # both ways read the same row
+if Rows['edges']['A']['B'] == {'w': 5} and Rows['edge_columns'].size == 2 and all(type(row) is int for neighbours in Rows['edges'].values() for row in neighbours._rows.values()):
+    print('ok')
+else:
+    print('not ok')
+
+# ~ edge type filtered searches
+print('Test index_edge_types() and edge_type filtered searches')
+with open(os.path.join(TmpDir, 'mixed.sif'), 'w') as f:
+    f.write('A\tpp\tB\tC\nB\tpd\tD\nD\tpp\tE\nC\tpd\tE\n')
+Mixed = gr.load_SIF(os.path.join(TmpDir, 'mixed.sif'), type_index=True)
+gr.add_edge(Mixed, 'B', 'E', {'type': 'pp'})
+
+if sorted(Mixed['typed_edges']['types']) == ['pd', 'pp'] and Mixed['typed_edges']['types']['pp']['B'] == {'E': {'type': 'pp'}}:
+    print('ok')
+else:
+    print('not ok')
+
+Expected = {'A': 0, 'B': 1, 'C': 1, 'D': inf, 'E': 2}
+
+if Expected == gr.BFS(Mixed, 'A', edge_type='pp')['distance'] and gr.BFS(Mixed, 'A', edge_type={'pp', 'pd'}) == gr.BFS(Mixed, 'A') \
+        and gr.DFS(Mixed, outputs=['predecessor'], edge_type=lambda u, v, att: att['type'] == 'pd')['predecessor']['E'] == 'C':
+    print('ok')
+else:
+    print('not ok')
+
+Unindexed = gr.load_SIF(os.path.join(TmpDir, 'mixed.sif'))
+if Expected == gr.BFS(Mixed, 'A', edge_type={'pp'})['distance'] and gr.BFS(Unindexed, 'A', edge_type=frozenset(['pp']))['distance'] == dict(Expected, E=inf):
+    print('ok')
+else:
+    print('not ok')
+
+Typed['edges']['A']['B']['kind'] = 'slow'  # typed after insertion: not indexed, filtered on the fly
+if gr.Bellman_Ford(Typed, 'A', 'weight', edge_type=lambda u, v, att: att.get('kind') != 'slow')['predecessor']['B'] == 'C':
+    print('ok')
+else:
+    print('not ok')
+del Typed['edges']['A']['B']['kind']
+
+# ~ incoming edges index
+print('Test index_in_edges(), predecessors() and in_degree()')
+Dressing = gr.load_SIF('Data_Test/Dressing.sif')
+Indexed = gr.create_graph(in_edges=True)
+gr.add_edges(Indexed, [(u, v) for u in Dressing['edges'] for v in Dressing['edges'][u]])
+
+if gr.predecessors(Indexed, 'shoes') == gr.predecessors(Dressing, 'shoes') == ['socks', 'trousers', 'underwear'] \
+        and gr.in_degree(Indexed, 'jacket') == gr.in_degree(Dressing, 'jacket') == 2 and gr.in_degree(Indexed, 'socks') == 0:
+    print('ok')
+else:
+    print('not ok')
+
+gr.remove_edge(Indexed, 'trousers', 'shoes')
+gr.index_in_edges(Dressing)
+if gr.predecessors(Indexed, 'shoes') == ['socks', 'underwear'] and Dressing['in_edges']['belt'] == {'shirt': {'type': 'before'}, 'trousers': {'type': 'before'}} \
+        and gr.shortest_path(Indexed, 'underwear', 'jacket') == ['underwear', 'trousers', 'belt', 'jacket']:
+    print('ok')
+else:
+    print('not ok')
+
+# ~ pagerank
+print('Test pagerank() and random_walk_with_restart()')
+Triangle = gr.create_graph(directed=False)
+for u, v in [('A', 'B'), ('B', 'C'), ('C', 'A'), ('C', 'D')]:
+    gr.add_edge(Triangle, u, v)
+Ranks = gr.pagerank(Triangle)
+Expected = {'A': 0.2459, 'B': 0.2459, 'C': 0.3667, 'D': 0.1414}
+
+if Ranks['converged'] and abs(sum(Ranks['rank'].values()) - 1) < 1e-9 and Expected == {n: round(r, 4) for n, r in Ranks['rank'].items()}:
+    print('ok')
+else:
+    print('not ok')
+
+Walks = gr.random_walk_with_restart(Triangle, [['A'], {'D': 1}])
+if len(Walks['rank']) == 2 and Walks['rank'][1] == gr.pagerank(Triangle, 0.85, ['D'])['rank'] \
+        and max(Walks['rank'][0], key=Walks['rank'][0].get) == 'A':
+    print('ok')
+else:
+    print('not ok')
+
+Single = [gr.pagerank(Triangle, personalization=p, tol=1e-6) for p in (['A'], ['D'])]
+Batch = gr.pagerank(Triangle, tol=1e-6, personalizations=[['A'], ['D']])
+if Batch['iterations'] == [r['iterations'] for r in Single] and Batch['rank'] == [r['rank'] for r in Single] and all(Batch['converged']):
+    print('ok')
+else:
+    print('not ok')
+
+Pairs = gr.create_graph()
+gr.add_edge(Pairs, ('A', 1), ('B', 2))
+gr.add_edge(Pairs, ('B', 2), ('A', 1))
+Ranks = gr.pagerank(Pairs, personalization=[('A', 1)])['rank']  # a list of tuple node ids is one restart distribution
+if Ranks[('A', 1)] > Ranks[('B', 2)] and gr.pagerank(gr.create_graph()) == {'rank': {}, 'iterations': 0, 'delta': 0.0, 'converged': True}:
+    print('ok')
+else:
+    print('not ok')
+
+Heavy = gr.create_graph()
+for u, v, w in [('A', 'B', 3), ('A', 'C', 1), ('B', 'A', 1), ('C', 'A', 1)]:
+    gr.add_edge(Heavy, u, v, {'weight': w})
+Ranks = gr.pagerank(Heavy, weight='weight')['rank']
+if abs(Ranks['B'] - 0.05 - 3 * (Ranks['C'] - 0.05)) < 1e-9 and gr.pagerank(gr.freeze(Heavy, 'weight'), weight='weight')['rank'] == Ranks:
+    print('ok')
+else:
+    print('not ok')
+
+# ~ betweenness
+print('Test betweenness()')
+Expected = {'socks': 0.0, 'shoes': 0.0, 'trousers': 2.0, 'shirt': 0.0, 'tie': 0.5, 'belt': 2.5, 'jacket': 0.0, 'underwear': 0.0}
+Path = gr.create_graph(directed=False)
+for u, v in [('A', 'B'), ('B', 'C'), ('C', 'D'), ('C', 'E')]:
+    gr.add_edge(Path, u, v, {'weight': 1})
+
+if Expected == gr.betweenness(Dressing, workers=1) and gr.betweenness(Path, workers=1) == gr.betweenness(Path, 'weight', workers=1) \
+        == {'A': 0.0, 'B': 3.0, 'C': 5.0, 'D': 0.0, 'E': 0.0}:
+    print('ok')
+else:
+    print('not ok')
+
+Sampled = gr.betweenness(Dressing, k=4, seed=1, workers=1)
+if gr.betweenness(Dressing, k=8, workers=1) == Expected and Sampled == gr.betweenness(Dressing, k=4, seed=1, workers=1) and set(Sampled) == set(Expected):
+    print('ok')
+else:
+    print('not ok')
+
+if gr.betweenness(Dressing, workers=2) == Expected and gr.betweenness(Path, 'weight', workers=2) == gr.betweenness(Path, 'weight', workers=1):
+    print('ok')
+else:
+    print('not ok')
+
+# ~ distance oracle
+print('Test DistanceOracle')
+Oracle = gr.DistanceOracle(Dressing, 3)
+Exact = {u: gr.BFS(Dressing, u)['distance'] for u in Dressing['nodes']}
+
+if [Oracle.ids[l] for l in Oracle.landmarks] == ['shoes', 'trousers', 'belt'] and Oracle.estimate('trousers', 'jacket') == (2, 2) \
+        and all(Oracle.estimate(u, v)[0] <= Exact[u][v] <= Oracle.estimate(u, v)[1] and Oracle.distance(u, v) == Exact[u][v]
+                for u in Exact for v in Exact):
+    print('ok')
+else:
+    print('not ok')
+
+Oracle = gr.DistanceOracle(Path, 2, strategy='random', weight='weight', seed=1)
+Oracle.save(os.path.join(TmpDir, 'oracle.bin'))
+Loaded = gr.DistanceOracle.load(os.path.join(TmpDir, 'oracle.bin'), Path)
+if all(Loaded.estimate(u, v) == Oracle.estimate(u, v) for u in Path['nodes'] for v in Path['nodes']) and Loaded.distance('A', 'E') == 3:
+    print('ok')
+else:
+    print('not ok')
+shutil.rmtree(TmpDir)  # last test writing files
+
+# ~ direction optimizing BFS
+print('Test direction_optimizing_BFS()')
+Result = gr.direction_optimizing_BFS(gr.freeze(Dressing, reverse=True), 'underwear')
+Expected = gr.BFS(Dressing, 'underwear')['distance']
+
+if {n: (d if d >= 0 else inf) for n, d in zip(Result['ids'], Result['distance'])} == Expected \
+        and Result['ids'][Result['predecessor'][Result['ids'].index('jacket')]] == 'belt':
+    print('ok')
+else:
+    print('not ok')
+
+Frozen = gr.freeze(Path)
+TopDown = gr.direction_optimizing_BFS(Frozen, 'A', alpha=0.001)
+BottomUp = gr.direction_optimizing_BFS(Frozen, 'A', alpha=inf, beta=inf)
+FrozenSifKeys = set(FrozenSif)
+Reused = gr.direction_optimizing_BFS(FrozenSif, 'underwear', reverse=gr.transpose(FrozenSif))
+if TopDown['distance'] == BottomUp['distance'] and list(TopDown['distance']) == [0, 1, 2, 3, 3] and set(BottomUp['steps']) == {'bottom-up'} \
+        and Reused['distance'] == Result['distance'] and set(FrozenSif) == FrozenSifKeys:
+    print('ok')
+else:
+    print('not ok')
+
+Refused = []
+for Args in [(Dressing, 'underwear'), (FrozenSif, 'underwear')]:  # dict graph, directed graph without its reverse
+    try:
+        gr.direction_optimizing_BFS(*Args)
+    except Exception:
+        Refused.append(Args[0] is Dressing)
+if Refused == [True, False] and set(FrozenSif) == FrozenSifKeys and 'reverse' not in gr.transpose(gr.freeze(Dressing, reverse=True)):
+    print('ok')
+else:
+    print('not ok')
+
+# ~ instrumentation
+print('Test profile() and profile callbacks')
+with gr.profile(memory=True) as Profiled:
+    gr.BFS(Dressing, 'underwear')
+    gr.DFS(Dressing)
+    gr.Bellman_Ford(Typed, 'A', 'weight', queue=True)
+Calls = {stats.algorithm: stats for stats in Profiled.calls}
+
+if [stats.algorithm for stats in Profiled.calls] == ['BFS', 'DFS', 'Bellman_Ford'] \
+        and (Calls['BFS'].nodes_expanded, Calls['BFS'].edges_scanned, Calls['BFS'].peak_frontier) == (5, 5, 2) \
+        and (Calls['DFS'].nodes_expanded, Calls['DFS'].edges_scanned, Calls['DFS'].peak_frontier) == (8, 9, 3) \
+        and Calls['Bellman_Ford'].relaxations > 0 and all(stats.peak_memory is not None and stats.wall_time > 0 for stats in Profiled.calls):
+    print('ok')
+else:
+    print('not ok')
+
+Seen = []
+gr.add_profile_callback(Seen.append)
+gr.BFS(Dressing, 'socks')
+gr.remove_profile_callback(Seen.append)
+gr.BFS(Dressing, 'socks')
+if len(Seen) == 1 and Seen[0].peak_memory is None and Profiled.summary()['DFS']['calls'] == 1 and not gr._profilers:
+    print('ok')
+else:
+    print('not ok')
+
+with gr.profile() as Profiled:
+    gr.is_acyclic(BellmanFord)  # stops at the first back edge
+    gr.Bellman_Ford(BellmanFord, 'C', 'weight')
+Acyclic, Passes = Profiled.calls
+if (Acyclic.nodes_expanded, Acyclic.edges_scanned) == (3, 3) and Passes.edges_scanned == Passes.iterations * BellmanFord['nb_edges'] and Passes.relaxations > 0:
+    print('ok')
+else:
+    print('not ok')
+
 
 print(""" 
 GeneOntology.py contains functions to:
@@ -584,6 +1196,15 @@ if Expected == go_basic1:
 else:
     print('not ok')
 
+print(' - Test load_OBO(in_edges=True) and load_GOA()')
+go_indexed = go.load_OBO('Data_Test/extract_go_basic.obo', in_edges=True)
+go.load_GOA(go_indexed, 'Data_Test/extract_annotation.goa')
+if {GO: set(children) for GO, children in go_indexed['descendants'].items()} == {GO: set(children) for GO, children in go_basic1['descendants'].items()} \
+        and all(go.GeneProducts(go_indexed, GO, all=a) == go.GeneProducts(go_basic1, GO, all=a) for GO in go_basic1['descendants'] for a in (True, False)):
+    print('ok')
+else:
+    print('not ok')
+
 print('''
  - Test load_GOA() with GoTerms missing, ok if prints:
 Warning: could not attach a gene product (M9NDU8) to a non existing GO Term (GO:0005739)